@@ -23,6 +23,7 @@ PYTHON_FILES = [
     "plugins",
     "extensions/molecule/",
     ".github/scripts",
+    "tests/unit",
 ]
 
 
@@ -207,6 +208,20 @@ def molecule(step: StepRunner, user_args: list[str] | None) -> None:
     )
 
 
+@managed_step(
+    ["--only-group=tests"],
+    dependencies_sync=True,
+    requires=["build"],
+    description="Run the unit tests against the collection",
+)
+def units(step: StepRunner, user_args: list[str] | None) -> None:
+    step.run(
+        ["pytest", *(user_args or []), "tests/unit"],
+        cwd=_get_collection_path(step),
+        env={"PYTHONPATH": str(step.cache_path / "ansible/collections")},
+    )
+
+
 ##
 # Docs
 ##
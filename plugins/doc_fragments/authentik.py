@@ -4,22 +4,100 @@ options:
   authentik_token:
     description:
       - The token used to authenticate against the Authentik server
+      - Required unless the module runs through the
+        P(benschubert.infrastructure.authentik#httpapi) plugin, which
+        authenticates itself
     type: str
-    required: true
   authentik_url:
     description:
       - The URL at which to contact the Authentik server
+      - Required unless the module runs through the
+        P(benschubert.infrastructure.authentik#httpapi) plugin, which
+        knows where the server is
     type: str
-    required: true
   ca_path:
     description:
       - PEM formatted file that contains a CA certificate to be used for
         validation
+      - Ignored when running through the
+        P(benschubert.infrastructure.authentik#httpapi) plugin
     type: str
+  max_retries:
+    description:
+      - The number of times to retry a request that failed because Authentik
+        was unavailable, timed out or closed the connection
+      - Retries are done with an exponential backoff, see O(retry_backoff).
+        A C(Retry-After) header sent by the server is respected.
+      - Creations are only retried when they are known not to have reached
+        Authentik
+    type: int
+    default: 5
+  page_size:
+    description:
+      - The number of entries to request per page when listing resources
+      - All pages are followed, this only changes the number of requests
+        needed and the size of each response
+    type: int
+    default: 100
+  perf:
+    description:
+      - Whether to return the timings of every request sent to Authentik, under
+        the C(_perf) key of the result, and statistics about the connections
+        used, under the C(connection) key
+      - Each entry contains the C(method), C(endpoint), C(status),
+        C(bytes_sent), C(bytes_received), C(bytes_decompressed) and
+        C(retries) of the request, and the C(timings), in milliseconds, spent
+        resolving the host (C(dns)), connecting (C(connect)), on the TLS
+        handshake (C(tls)), waiting for the response (C(first_byte)) and in
+        total (C(total)), including retries
+      - C(dns), C(connect) and C(tls) are only reported for requests that
+        opened a new connection. When running through the
+        P(benschubert.infrastructure.authentik#httpapi) plugin, only
+        C(first_byte) and C(total) are reported
+      - Responses are requested compressed, C(bytes_received) is the size of
+        the response as received and C(bytes_decompressed) once decompressed.
+        Responses that were not read entirely, because only their first
+        results were needed, report what was read until then
+      - C(connection) contains the number of C(requests) sent, of connections
+        opened (C(handshakes)), of requests that reused an open connection
+        (C(handshakes_avoided)) and of TLS sessions resumed
+        (C(tls_sessions_resumed)). When running through the
+        P(benschubert.infrastructure.authentik#httpapi) plugin, these are
+        the connections of the persistent connection process
+    type: bool
+    default: false
+  perf_log:
+    description:
+      - A file to which to append the timings of every request, as described
+        in O(perf), as JSON lines
+      - Each line also contains the C(module) that sent the request and a
+        C(timestamp), in ISO 8601 format
+      - The file is written on the host running the module, which is the
+        controller when running through the
+        P(benschubert.infrastructure.authentik#httpapi) plugin or when
+        delegating to localhost
+      - This allows aggregating the timings across a whole playbook run
+    type: path
+  retry_backoff:
+    description:
+      - The maximum number of seconds to wait before the first retry
+      - This doubles for every following retry, and a random delay up to that
+        value is used
+    type: float
+    default: 0.2
+  return_fields:
+    description:
+      - The fields of the resources to return, in C(data) and in the diff
+      - By default, all fields are returned except the expanded related
+        resources, like C(providers_obj) or C(groups_obj), which can be large
+    type: list
+    elements: str
   timeout:
     description:
       - The timeout to set when contacting the Authentik Server.
       - If your server is slow to respond, it might be necessary to bump this
+      - Ignored when running through the
+        P(benschubert.infrastructure.authentik#httpapi) plugin
     type: int
     default: 10
   validate_certs:
@@ -27,6 +105,8 @@ options:
       - If false, SSL certificates will not be validated.
       - This should only set to false used on personally controlled sites
         using self-signed certificates.
+      - Ignored when running through the
+        P(benschubert.infrastructure.authentik#httpapi) plugin
     type: bool
     default: true
 """
@@ -42,3 +122,48 @@ options:
       - present
       - absent
 """
+
+    CONCURRENT = """
+options:
+  max_concurrency:
+    description:
+      - The maximum number of requests to send to the Authentik server at the
+        same time
+      - Setting this to 1 processes everything sequentially
+    type: int
+    default: 4
+"""
+
+    FINGERPRINT = """
+options:
+  fingerprint_cache:
+    description:
+      - A file in which to record the resources that were verified to be in
+        their desired state
+      - When provided, a resource that was verified less than
+        O(fingerprint_ttl) seconds ago with the same desired value and state
+        is reported as up to date without contacting Authentik. The value last
+        seen on the server is then returned
+      - Changes made outside of Ansible are thus only noticed once the
+        verification expires, or when using O(force_verify)
+      - The file is written on the host running the module, which is the
+        controller when running through the
+        P(benschubert.infrastructure.authentik#httpapi) plugin or when
+        delegating to localhost. It contains the resources, and is thus only
+        readable by its owner
+    type: path
+  fingerprint_ttl:
+    description:
+      - The number of seconds during which a verification is trusted, see
+        O(fingerprint_cache)
+    type: int
+    default: 3600
+  force_verify:
+    description:
+      - Whether to verify the resources against Authentik even if they were
+        verified recently, see O(fingerprint_cache)
+      - The verification is recorded again, so this can be used periodically
+        to detect changes made outside of Ansible
+    type: bool
+    default: false
+"""
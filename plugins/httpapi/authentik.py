@@ -0,0 +1,131 @@
+DOCUMENTATION = """
+---
+name: authentik
+short_description: Run the Authentik modules through a persistent connection
+description:
+  - This plugin allows running the Authentik modules of this collection
+    through the P(ansible.netcommon.httpapi#connection) connection.
+  - The modules then run on the controller and send their requests through
+    the persistent connection process, which keeps an authenticated
+    connection to the Authentik server open across tasks.
+  - When used, the C(authentik_url), C(authentik_token), C(ca_path),
+    C(timeout) and C(validate_certs) options of the modules are not needed.
+    The connection settings are used instead.
+options:
+  authentik_token:
+    description:
+      - The token used to authenticate against the Authentik server
+      - Defaults to the password of the connection
+    type: str
+    vars:
+      - name: ansible_httpapi_authentik_token
+
+author:
+  - Benjamin Schubert (@benjaminschubert)
+"""
+
+EXAMPLES = """
+# With the host configured in the inventory as follows:
+#
+# authentik:
+#   hosts:
+#     authentik.test:
+#       ansible_connection: ansible.netcommon.httpapi
+#       ansible_network_os: benschubert.infrastructure.authentik
+#       ansible_httpapi_use_ssl: true
+#       ansible_httpapi_authentik_token: <my-secret-token>
+
+# In the playbook, targeting the host above
+- name: Create a group named 'Grafana Admins'
+  benschubert.infrastructure.authentik_group:
+    group:
+      name: Grafana Admins
+"""
+
+import http.client
+from typing import Any, cast
+
+from ansible.module_utils.connection import ConnectionError  # noqa: A004
+from ansible.plugins.httpapi import HttpApiBase
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.connection_pool import (
+    ConnectionPool,
+    get_connection_pool,
+    get_error_code,
+)
+
+
+class HttpApi(HttpApiBase):  # type: ignore[misc]
+    """An httpapi plugin that sends requests to an Authentik server."""
+
+    def __init__(self, connection: Any) -> None:
+        super().__init__(connection)
+        self._pool: ConnectionPool | None = None
+
+    def _get_pool(self) -> ConnectionPool:
+        if self._pool is None:
+            self._pool = get_connection_pool(
+                self.base_url(),
+                self.connection.get_option("ca_path"),
+                self.connection.get_option("validate_certs"),
+                self.connection.get_option("persistent_command_timeout"),
+            )
+        return self._pool
+
+    def base_url(self) -> str:
+        """
+        Get the url of the Authentik server.
+
+        :return: The url of the server
+        """
+        use_ssl = self.connection.get_option("use_ssl")
+        scheme = "https" if use_ssl else "http"
+        port = self.connection.get_option("port") or (443 if use_ssl else 80)
+        return f"{scheme}://{self.connection.get_option('host')}:{port}/"
+
+    def send_request(
+        self, data: str | None, **message_kwargs: Any
+    ) -> tuple[int, dict[str, str], str]:
+        """
+        Send the request to the Authentik server.
+
+        :param data: The body of the request
+        :param message_kwargs: The C(path), including the query, to contact,
+                               the http C(method) to use and any additional
+                               C(headers) to send along the request
+        :return: The status, headers and body of the response
+        """
+        token = self.get_option("authentik_token")
+        if not token:
+            token = self.connection.get_option("password")
+        if not token:
+            msg = (
+                "No token configured to authenticate against Authentik,"
+                " please set ansible_httpapi_authentik_token"
+            )
+            raise ConnectionError(msg)
+
+        try:
+            status, headers, body = self._get_pool().request(
+                message_kwargs.get("method", "GET"),
+                message_kwargs["path"],
+                body=data.encode() if data is not None else None,
+                headers={
+                    **message_kwargs.get("headers", {}),
+                    "Authorization": f"Bearer {token}",
+                },
+            )
+        except (OSError, http.client.HTTPException) as exc:
+            code = get_error_code(exc)
+            if code is None:
+                raise ConnectionError(str(exc)) from exc
+            raise ConnectionError(str(exc), code=code) from exc
+
+        return status, dict(headers), body.decode()
+
+    def connection_stats(self) -> dict[str, int]:
+        """
+        Get statistics about the connections opened to the Authentik server.
+
+        :return: The statistics, as returned by :meth:`ConnectionPool.stats`
+        """
+        return cast("dict[str, int]", self._get_pool().stats())
@@ -0,0 +1,265 @@
+DOCUMENTATION = """
+---
+name: authentik
+short_description: Look up Authentik resources by name
+description:
+  - This lookup returns a field, by default the primary key, of the Authentik
+    resources of the given kind with the provided names.
+  - Results are memoized for the whole playbook run, so looking up the same
+    resource again, even from another task or role, doesn't contact the
+    server. Use O(invalidate) to fetch a resource again, for example after
+    modifying it.
+  - Resources that do not exist are returned as null, and are not memoized.
+options:
+  _terms:
+    description:
+      - The names of the resources to look up
+      - This is the slug for applications and flows, the scope name for
+        scopes and the username for users
+    required: true
+  kind:
+    description:
+      - The kind of resources to look up
+    type: str
+    required: true
+    choices:
+      - application
+      - certificate
+      - flow
+      - group
+      - outpost
+      - provider_oauth2
+      - provider_proxy
+      - scope
+      - user
+  field:
+    description:
+      - The field of the resources to return
+      - Set to an empty string to return the whole resources
+    type: str
+    default: pk
+  invalidate:
+    description:
+      - Whether to forget the memoized resources and fetch them again
+    type: bool
+    default: false
+  authentik_token:
+    description:
+      - The token used to authenticate against the Authentik server
+    type: str
+    required: true
+    env:
+      - name: AUTHENTIK_TOKEN
+  authentik_url:
+    description:
+      - The URL at which to contact the Authentik server
+    type: str
+    required: true
+    env:
+      - name: AUTHENTIK_URL
+  ca_path:
+    description:
+      - PEM formatted file that contains a CA certificate to be used for
+        validation
+    type: str
+  timeout:
+    description:
+      - The timeout to set when contacting the Authentik Server.
+    type: int
+    default: 10
+  validate_certs:
+    description:
+      - If false, SSL certificates will not be validated.
+      - This should only set to false used on personally controlled sites
+        using self-signed certificates.
+    type: bool
+    default: true
+
+author:
+  - Benjamin Schubert (@benjaminschubert)
+"""
+
+EXAMPLES = """
+- name: Configure a provider with the default flows
+  benschubert.infrastructure.authentik_provider_proxy:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    provider:
+      name: My application
+      authorization_flow: >-
+        {{
+          lookup(
+            'benschubert.infrastructure.authentik',
+            'default-provider-authorization-explicit-consent',
+            kind='flow',
+            authentik_token='<my-secret-token>',
+            authentik_url='https://authentik.test/',
+          )
+        }}
+      external_host: https://my-application.test
+      invalidation_flow: >-
+        {{
+          lookup(
+            'benschubert.infrastructure.authentik',
+            'default-provider-invalidation-flow',
+            kind='flow',
+            authentik_token='<my-secret-token>',
+            authentik_url='https://authentik.test/',
+          )
+        }}
+      mode: forward_single
+"""
+
+RETURN = """
+_raw:
+  description:
+    - The requested field of each resource, or the whole resources if
+      O(field) is empty
+  type: list
+  elements: raw
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import tempfile
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode, urljoin
+
+from ansible import constants as C  # noqa: N812
+from ansible.errors import AnsibleLookupError
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik_kinds import (
+    NAMED_KINDS,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.connection_pool import (
+    ConnectionPool,
+    get_connection_pool,
+)
+
+# Lookups run in a new process for every task, which all share the local
+# temporary directory of the playbook run, removed when it ends.
+_MEMO_PATH = Path(
+    C.DEFAULT_LOCAL_TMP,  # pylint: disable=no-member
+    "authentik_lookup",
+)
+_MEMO: dict[str, dict[str, Any]] = {}
+
+
+def _memo_file(key: str) -> Path:
+    return _MEMO_PATH / hashlib.sha256(key.encode()).hexdigest()
+
+
+def _forget(key: str) -> None:
+    _MEMO.pop(key, None)
+    _memo_file(key).unlink(missing_ok=True)
+
+
+def _recall(key: str) -> dict[str, Any] | None:
+    if key not in _MEMO:
+        try:
+            _MEMO[key] = json.loads(
+                _memo_file(key).read_text(encoding="utf-8")
+            )
+        except FileNotFoundError:
+            return None
+    return _MEMO[key]
+
+
+def _memoize(key: str, resource: dict[str, Any]) -> None:
+    _MEMO[key] = resource
+    _MEMO_PATH.mkdir(mode=0o700, exist_ok=True)
+    # Write atomically, another task could be reading it concurrently
+    fd, tmp_path = tempfile.mkstemp(dir=_MEMO_PATH)
+    with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+        json.dump(resource, tmp)
+    Path(tmp_path).replace(_memo_file(key))
+
+
+class LookupModule(LookupBase):  # type: ignore[misc]
+    """Look up Authentik resources by name."""
+
+    def _fetch(
+        self, pool: ConnectionPool, url: str, query: dict[str, str]
+    ) -> dict[str, Any] | None:
+        try:
+            status, _, body = pool.request(
+                "GET",
+                f"{url}?{urlencode({**query, 'page_size': 2})}",
+                headers={
+                    "Accept": "application/json",
+                    "Authorization": (
+                        f"Bearer {self.get_option('authentik_token')}"
+                    ),
+                },
+            )
+        except (OSError, http.client.HTTPException) as exc:
+            msg = f"Error contacting Authentik at {url}: {exc}"
+            raise AnsibleLookupError(msg) from exc
+
+        if status != HTTPStatus.OK:
+            msg = (
+                f"Error contacting Authentik at {url}, received a {status}:"
+                f" {body.decode(errors='replace')}"
+            )
+            raise AnsibleLookupError(msg)
+
+        results: list[dict[str, Any]] = json.loads(body)["results"]
+        if len(results) > 1:
+            msg = f"Expected only one result back from api for {query}"
+            raise AnsibleLookupError(msg)
+        return results[0] if results else None
+
+    def run(
+        self,
+        terms: list[str],
+        variables: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> list[Any]:
+        """
+        Look up the Authentik resources with the provided names.
+
+        :param terms: The names of the resources to look up
+        :param variables: The variables available to the task
+        :param kwargs: The options of the lookup
+        :return: The requested field of each resource
+        """
+        self.set_options(var_options=variables, direct=kwargs)
+        api_slug, param = NAMED_KINDS[self.get_option("kind")]
+        url = urljoin(self.get_option("authentik_url"), api_slug)
+        field = self.get_option("field")
+
+        pool = get_connection_pool(
+            url,
+            self.get_option("ca_path"),
+            self.get_option("validate_certs"),
+            self.get_option("timeout"),
+        )
+
+        values = []
+        for term in terms:
+            query = {param: term}
+            key = json.dumps([url, query], sort_keys=True)
+            if self.get_option("invalidate"):
+                _forget(key)
+
+            resource = _recall(key)
+            if resource is None:
+                resource = self._fetch(pool, url, query)
+                if resource is not None:
+                    _memoize(key, resource)
+
+            if resource is not None and field:
+                if field not in resource:
+                    msg = (
+                        f"The {self.get_option('kind')} {term} has no field"
+                        f" {field}"
+                    )
+                    raise AnsibleLookupError(msg)
+                values.append(resource[field])
+            else:
+                values.append(resource)
+        return values
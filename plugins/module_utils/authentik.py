@@ -1,21 +1,60 @@
 """This module provides utilities to work with Authentik APIs."""
 
+import functools
+import http.client
+import io
+import itertools
 import json
-from collections.abc import Callable
+import random
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import closing
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from http import HTTPStatus
-from typing import Any, Literal, NoReturn, cast
-from urllib.parse import urlencode, urljoin
+from pathlib import Path
+from typing import Any, Literal, NoReturn, Protocol, cast
+from urllib.parse import urlencode, urljoin, urlsplit
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.urls import fetch_url
-
-
-def get_base_arguments(include_state: bool = True) -> dict[str, Any]:
+from ansible.module_utils.connection import Connection
+from ansible.module_utils.connection import (
+    ConnectionError as PersistentConnectionError,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    DEFAULT_MAX_CONCURRENCY,
+    fail,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.connection_pool import (
+    ConnectionPool,
+    get_connection_pool,
+    get_error,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.fingerprint_cache import (
+    get_fingerprint_cache,
+    save_fingerprint_caches,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.json_stream import (
+    JSONListStream,
+)
+
+
+def get_base_arguments(
+    include_state: bool = True,
+    include_concurrency: bool = False,
+    include_fingerprint: bool = False,
+) -> dict[str, Any]:
     """Get the base arguments required for the AUthentik utility."""
-    base = {
-        "authentik_url": {"type": "str", "required": True},
-        "authentik_token": {"type": "str", "required": True, "no_log": True},
+    base: dict[str, Any] = {
+        "authentik_url": {"type": "str"},
+        "authentik_token": {"type": "str", "no_log": True},
         "ca_path": {"type": "str", "required": False},
+        "max_retries": {"type": "int", "default": 5},
+        "page_size": {"type": "int", "default": 100},
+        "perf": {"type": "bool", "default": False},
+        "perf_log": {"type": "path"},
+        "retry_backoff": {"type": "float", "default": 0.2},
+        "return_fields": {"type": "list", "elements": "str"},
         "timeout": {"type": "int", "default": 10},
         "validate_certs": {"type": "bool", "default": True},
     }
@@ -25,9 +64,237 @@ def get_base_arguments(include_state: bool = True) -> dict[str, Any]:
             "choices": ["present", "absent"],
             "default": "present",
         }
+    if include_concurrency:
+        base["max_concurrency"] = {
+            "type": "int",
+            "default": DEFAULT_MAX_CONCURRENCY,
+        }
+    if include_fingerprint:
+        base["fingerprint_cache"] = {"type": "path"}
+        base["fingerprint_ttl"] = {"type": "int", "default": 3600}
+        base["force_verify"] = {"type": "bool", "default": False}
     return base
 
 
+# Statuses returned by Traefik or Authentik while the latter is (re)starting
+_RETRYABLE_STATUSES = {
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+_MAX_RETRY_DELAY = 30
+
+# datetime.UTC needs Python 3.11 on the managed host
+_UTC = timezone.utc  # noqa: UP017
+
+
+def get_retry_delay(
+    attempt: int, backoff: float, retry_after: str | None = None
+) -> float:
+    """
+    Compute how long to wait before retrying a failed request.
+
+    This uses an exponential backoff with full jitter, unless the server told
+    us how long to wait with a ``Retry-After`` header.
+
+    :param attempt: The number of the attempt that failed, starting at 0
+    :param backoff: The maximum delay before the first retry
+    :param retry_after: The value of the ``Retry-After`` header of the failed
+                        response, if any
+    :return: The number of seconds to wait
+    """
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                date = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                pass
+            else:
+                delay = (date - datetime.now(_UTC)).total_seconds()
+                return min(max(delay, 0), _MAX_RETRY_DELAY)
+        else:
+            return min(max(delay, 0), _MAX_RETRY_DELAY)
+
+    return random.uniform(  # noqa: S311
+        0, min(backoff * 2**attempt, _MAX_RETRY_DELAY)
+    )
+
+
+class ResponseBody(Protocol):
+    """
+    The body of a response, as returned by the transports.
+
+    The body is decompressed while being read, :attr:`bytes_received` holds
+    the number of bytes that were actually received.
+    """
+
+    bytes_received: int
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read the body of the response.
+
+        :param size: The maximum number of bytes to read, all if negative
+        :return: The bytes read, empty once the whole body was read
+        """
+
+    def close(self) -> None:
+        """Stop reading the response."""
+
+
+class _BufferedResponse(io.BytesIO):
+    """
+    A response that was already entirely read.
+
+    :param data: The decompressed body of the response
+    :param bytes_received: The number of bytes that were received
+    """
+
+    def __init__(self, data: bytes, bytes_received: int) -> None:
+        super().__init__(data)
+        self.bytes_received = bytes_received
+
+
+class PersistentConnection:
+    """
+    Send requests through the ``benschubert.infrastructure.authentik`` plugin.
+
+    This is used when the module runs with the ``ansible.netcommon.httpapi``
+    connection, in which case the persistent connection process on the
+    controller already holds an authenticated connection to the server.
+
+    :param socket_path: The path to the socket of the persistent connection
+    """
+
+    def __init__(self, socket_path: str) -> None:
+        self._connection = Connection(socket_path)
+        self._initial_stats = self._connection.connection_stats()
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timings: dict[str, float] | None = None,
+    ) -> tuple[int, Mapping[str, str], ResponseBody]:
+        """
+        Send a request to the server, through the persistent connection.
+
+        The persistent connection only returns whole responses, which are thus
+        already entirely in memory, and already decompressed.
+
+        :param method: The http method to use
+        :param url: The url to contact, only the path and query are used
+        :param body: The body to send along the request
+        :param headers: The headers to send along the request
+        :param timings: If provided, the time spent, in seconds, waiting for
+                        the response is stored under ``first_byte``. The
+                        persistent connection does not report more details.
+        :return: The status, headers and body of the response
+        :raise TimeoutError: if the server did not answer in time
+        :raise ConnectionError: if the connection to the server failed
+        :raise PersistentConnectionError: for any other error
+        """
+        start = time.perf_counter()
+        try:
+            status, response_headers, data = self._connection.send_request(
+                body.decode() if body is not None else None,
+                path=url,
+                method=method,
+                headers=headers or {},
+            )
+        except PersistentConnectionError as exc:
+            # Report timeouts and connection errors as for direct connections,
+            # so that the same requests are retried
+            error = get_error(getattr(exc, "code", None), str(exc))
+            if error is None:
+                raise
+            raise error from exc
+        if timings is not None:
+            timings["first_byte"] = time.perf_counter() - start
+
+        content = data.encode()
+        # The compressed size is only known if the server sent it
+        bytes_received = int(
+            response_headers.get("Content-Length", len(content))
+        )
+        return (
+            status,
+            response_headers,
+            _BufferedResponse(content, bytes_received),
+        )
+
+    def base_url(self) -> str:
+        """
+        Get the url of the server the persistent connection talks to.
+
+        :return: The url of the server
+        """
+        return cast("str", self._connection.base_url())
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get statistics about the connections used during this module run.
+
+        :return: The same statistics as :meth:`ConnectionPool.stats`
+        """
+        current = self._connection.connection_stats()
+        return {
+            key: value - self._initial_stats[key]
+            for key, value in current.items()
+        }
+
+
+def project(value: dict[str, Any], fields: list[str] | None) -> dict[str, Any]:
+    """
+    Keep only the requested fields of a resource.
+
+    :param value: The resource, as returned by the API
+    :param fields: The fields to keep. If None, all fields are kept except the
+                   expanded related resources, ending in ``_obj``.
+    :return: The projected resource
+    """
+    if fields is None:
+        return {
+            key: field
+            for key, field in value.items()
+            if not key.endswith("_obj")
+        }
+    return {key: value[key] for key in fields if key in value}
+
+
+def project_result(
+    module: AnsibleModule, result: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    Project the resources in the result according to ``return_fields``.
+
+    This applies :func:`project` to the ``data`` of the result, and to the
+    ``before`` and ``after`` values of its ``diff``.
+
+    :param module: The ansible module
+    :param result: The result to return from the module
+    :return: The projected result
+    """
+    fields = module.params["return_fields"]
+    projected = dict(result)
+    if isinstance(result.get("data"), dict):
+        projected["data"] = project(result["data"], fields)
+    if isinstance(result.get("diff"), dict):
+        projected["diff"] = {
+            key: project(value, fields) if isinstance(value, dict) else value
+            for key, value in result["diff"].items()
+        }
+    return projected
+
+
+# The timings of the requests done during this module run, when requested
+_PERF_RECORDS: list[dict[str, Any]] = []
+
+
 class Authentik:
     """
     A utility to handle Authentik resources via APIs.
@@ -38,18 +305,171 @@ class Authentik:
 
     def __init__(self, module: AnsibleModule, api_slug: str) -> None:
         self._module = module
-        self._url = module.params["authentik_url"]
         self._token = module.params["authentik_token"]
-        self._ca_path = module.params["ca_path"]
-        self._timeout = module.params["timeout"]
+        self._page_size = module.params["page_size"]
         self._api_slug = api_slug
 
+        self._transport: ConnectionPool | PersistentConnection
+        if module._socket_path:  # noqa: SLF001
+            # We go through the httpapi connection, which knows the server
+            self._url = "/"
+            self._transport = PersistentConnection(module._socket_path)  # noqa: SLF001
+        else:
+            if not module.params["authentik_url"] or not self._token:
+                fail(
+                    module,
+                    "authentik_url and authentik_token are required"
+                    " when not using the benschubert.infrastructure.authentik"
+                    " httpapi connection",
+                )
+
+            self._url = module.params["authentik_url"]
+            self._transport = get_connection_pool(
+                self._url,
+                module.params["ca_path"],
+                module.params["validate_certs"],
+                module.params["timeout"],
+                module.params.get("max_concurrency", 1),
+            )
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None,
+        headers: dict[str, str],
+        timings: dict[str, float],
+    ) -> tuple[int, ResponseBody, int]:
+        """
+        Send the request, retrying it if Authentik is temporarily unavailable.
+
+        :param method: The http method to use
+        :param url: The url to contact
+        :param body: The body of the request
+        :param headers: The headers to send along the request
+        :param timings: Filled with the timings of the last attempt, see
+                        :meth:`ConnectionPool.open`
+        :return: The status and body of the response, which must be closed,
+                 and the number of retries that were needed
+        """
+        max_retries = self._module.params["max_retries"]
+        backoff = self._module.params["retry_backoff"]
+
+        attempt = 0
+        while True:
+            timings.clear()
+            try:
+                status, response_headers, response = self._transport.open(
+                    method,
+                    url,
+                    body=body,
+                    headers=headers,
+                    timings=timings,
+                )
+            except (TimeoutError, ConnectionError) as exc:
+                # Retrying a POST could create the resource twice, unless we
+                # know it never reached the server
+                retryable = method != "POST" or isinstance(
+                    exc, ConnectionRefusedError
+                )
+                if not retryable or attempt >= max_retries:
+                    fail(
+                        self._module,
+                        f"Error contacting Authentik at {url}: {exc}",
+                    )
+                delay = get_retry_delay(attempt, backoff)
+            except (
+                OSError,
+                http.client.HTTPException,
+                PersistentConnectionError,
+            ) as exc:
+                fail(
+                    self._module, f"Error contacting Authentik at {url}: {exc}"
+                )
+            else:
+                retryable = status in _RETRYABLE_STATUSES and (
+                    method != "POST"
+                    or status == HTTPStatus.SERVICE_UNAVAILABLE
+                )
+                if not retryable or attempt >= max_retries:
+                    break
+                response.close()
+                delay = get_retry_delay(
+                    attempt, backoff, response_headers.get("Retry-After")
+                )
+
+            time.sleep(delay)
+            attempt += 1
+
+        return status, response, attempt
+
+    def _prepare(
+        self, endpoint: str, queryparams: dict[str, str] | None
+    ) -> tuple[str, dict[str, str]]:
+        url = urljoin(self._url, self._api_slug)
+        if endpoint:
+            url = urljoin(url, endpoint)
+
+        if queryparams is not None:
+            params = urlencode(queryparams)
+            url += f"?{params}"
+
+        headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        }
+        if self._token:
+            headers["Authorization"] = f"Bearer {self._token}"
+        return url, headers
+
+    def _read(  # type: ignore[return]
+        self, url: str, response: ResponseBody, size: int = -1
+    ) -> bytes:
+        try:
+            return response.read(size)
+        except (OSError, http.client.HTTPException) as exc:
+            fail(self._module, f"Error contacting Authentik at {url}: {exc}")
+
+    def _record(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        sizes: tuple[int, int, int],
+        retries: int,
+        timings: dict[str, float],
+    ) -> None:
+        if not (
+            self._module.params["perf"] or self._module.params["perf_log"]
+        ):
+            return
+
+        _PERF_RECORDS.append(
+            {
+                "timestamp": datetime.now(_UTC).isoformat(),
+                "method": method,
+                "endpoint": urlsplit(url).path,
+                "status": status,
+                "bytes_sent": sizes[0],
+                "bytes_received": sizes[1],
+                "bytes_decompressed": sizes[2],
+                "retries": retries,
+                # In milliseconds, which is more readable
+                "timings": {
+                    key: round(value * 1000, 3)
+                    for key, value in timings.items()
+                },
+            }
+        )
+
     def request(  # type: ignore[return]  # noqa: RET503
         self,
         endpoint: str = "",
         data: dict[str, Any] | None = None,
         queryparams: dict[str, str] | None = None,
-        method: Literal["DELETE", "GET", "POST", "PUT"] = "GET",
+        method: Literal["DELETE", "GET", "PATCH", "POST", "PUT"] = "GET",
+        *,
+        allow_missing: bool = True,
     ) -> dict[str, Any] | None:
         """
         Execute the provided request on the server.
@@ -59,43 +479,107 @@ class Authentik:
         :param data; The data to add to the request
         :param queryparams: The parameters to add as url query parameters
         :param method: The http method to use
+        :param allow_missing: Whether to return None when the server answers
+                              that the resource does not exist, rather than
+                              failing
         :return: The data returned by the server
         """
-        url = urljoin(self._url, self._api_slug)
-        if endpoint:
-            url = urljoin(url, endpoint)
-
-        if queryparams is not None:
-            params = urlencode(queryparams)
-            url += f"?{params}"
+        url, headers = self._prepare(endpoint, queryparams)
+        payload = json.dumps(data).encode() if data else None
+        timings: dict[str, float] = {}
+        start = time.perf_counter()
+        status, response, retries = self._send(
+            method, url, payload, headers, timings
+        )
+        with closing(response):
+            body = self._read(url, response)
 
-        response, info = fetch_url(
-            self._module,
+        timings["total"] = time.perf_counter() - start
+        self._record(
+            method,
             url,
-            data=json.dumps(data) if data else None,
-            headers={
-                "Authorization": f"Bearer {self._token}",
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-            },
-            ca_path=self._ca_path,
-            method=method,
-            timeout=self._timeout,
+            status,
+            (len(payload or b""), response.bytes_received, len(body)),
+            retries,
+            timings,
         )
 
-        if info["status"] == HTTPStatus.NO_CONTENT:
+        if status == HTTPStatus.NO_CONTENT:
             return None
-        if info["status"] in [HTTPStatus.OK, HTTPStatus.CREATED]:
-            return cast("dict[str, Any]", json.loads(response.read()))
-        if info["status"] == HTTPStatus.NOT_FOUND:
+        if status in [HTTPStatus.OK, HTTPStatus.CREATED]:
+            return cast("dict[str, Any]", json.loads(body))
+        if status == HTTPStatus.NOT_FOUND and allow_missing:
             return None
 
-        self._module.fail_json(
-            msg=f"Error contacting Authentik at {info['url']},"
-            f" received a {info['status']}:"
-            f" {info.get('body', info.get('msg'))}",
+        fail(
+            self._module,
+            f"Error contacting Authentik at {url},"
+            f" received a {status}:"
+            f" {body.decode(errors='replace')}",
         )
 
+    def iterate(
+        self,
+        queryparams: dict[str, str] | None = None,
+        page_size: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over all the resources matching the provided query parameters.
+
+        The resources are decoded one at a time while the response is being
+        read, and pages are fetched lazily, only once all the entries of the
+        previous one have been consumed. Memory usage thus doesn't grow with
+        the size of the pages, and stopping the iteration early avoids reading
+        the rest of the response and fetching the remaining pages.
+
+        :param queryparams: A search query to filter the resources
+        :param page_size: The number of resources to fetch per request,
+                          defaults to the module's ``page_size``
+        :return: An iterator over the resources
+        """
+        params = {
+            **(queryparams or {}),
+            "page_size": str(page_size or self._page_size),
+        }
+
+        page = 1
+        while page:
+            url, headers = self._prepare("", {**params, "page": str(page)})
+            timings: dict[str, float] = {}
+            start = time.perf_counter()
+            status, response, retries = self._send(
+                "GET", url, None, headers, timings
+            )
+
+            with closing(response):
+                if status != HTTPStatus.OK:
+                    body = self._read(url, response)
+                    fail(
+                        self._module,
+                        f"Error contacting Authentik at {url},"
+                        f" received a {status}:"
+                        f" {body.decode(errors='replace')}",
+                    )
+
+                stream = JSONListStream(
+                    functools.partial(self._read, url, response), "results"
+                )
+                try:
+                    yield from stream
+                finally:
+                    # Also record pages that were not entirely read
+                    timings["total"] = time.perf_counter() - start
+                    self._record(
+                        "GET",
+                        url,
+                        status,
+                        (0, response.bytes_received, stream.bytes_read),
+                        retries,
+                        timings,
+                    )
+
+            page = stream.fields["pagination"]["next"]
+
     def get_one(  # type: ignore[return]  # noqa: RET503
         self,
         queryparams: dict[str, str],
@@ -108,17 +592,16 @@ class Authentik:
         :param queryparams: A search query to identify a unique resource
         :return: The resource
         """
-        result = self.request(queryparams=queryparams)
-        assert result is not None
-
-        results = result["results"]
+        # We only need to know whether there is more than one result
+        results = list(itertools.islice(self.iterate(queryparams), 2))
         if len(results) == 0:
             return None
         if len(results) == 1:
-            return cast("dict[str, Any]", results[0])
+            return results[0]
 
-        self._module.fail_json(
-            msg="Expected only one result back from api",
+        fail(
+            self._module,
+            "Expected only one result back from api",
             result=results,
         )
 
@@ -163,6 +646,72 @@ class Authentik:
         assert result is not None
         return result
 
+    def patch(self, identifier: str, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Update only the provided fields of the resource.
+
+        :param identifier: where the resource lives
+        :param data: the fields to update, and their new value
+        :return: The full value of the updated data
+        """
+        result = self.request(f"{identifier}/", data=data, method="PATCH")
+        assert result is not None
+        return result
+
+    def fingerprint_key(self, identity: Any) -> str:
+        """
+        Get the key identifying a resource in a fingerprint cache.
+
+        :param identity: What uniquely identifies the resource on the server
+        :return: The key for the resource
+        """
+        url = self._url
+        if isinstance(self._transport, PersistentConnection):
+            url = self._transport.base_url()
+        return json.dumps([url, self._api_slug, identity], sort_keys=True)
+
+    def exit_json(self, **kwargs: Any) -> NoReturn:  # type: ignore[misc]
+        """
+        Exit the module with the provided result.
+
+        The resources in the result are projected with
+        :func:`project_result`.
+
+        If requested, this also returns the timings of every request under the
+        ``_perf`` key and statistics about the connections used to talk to
+        Authentik under the ``connection`` key, and appends the timings as
+        JSON lines to the ``perf_log`` file.
+
+        :param kwargs: The result to return
+        """
+        if self._module.params["perf_log"]:
+            module_name = self._module._name  # noqa: SLF001 # pylint: disable=protected-access
+            try:
+                with Path(self._module.params["perf_log"]).open(
+                    "a", encoding="utf-8"
+                ) as log:
+                    # Write all lines at once, to not mix them with other modules'
+                    log.write(
+                        "".join(
+                            json.dumps({"module": module_name, **record})
+                            + "\n"
+                            for record in _PERF_RECORDS
+                        )
+                    )
+            except OSError as exc:
+                self._module.warn(f"Could not write the perf log: {exc}")
+
+        if self._module.params["perf"]:
+            kwargs["_perf"] = _PERF_RECORDS
+            kwargs["connection"] = self._transport.stats()
+
+        try:
+            save_fingerprint_caches()
+        except OSError as exc:
+            self._module.warn(f"Could not save the fingerprint cache: {exc}")
+
+        self._module.exit_json(**project_result(self._module, kwargs))
+
 
 def _compare(
     existing: dict[str, Any] | None, final: dict[str, Any] | None
@@ -170,9 +719,9 @@ def _compare(
     return existing == final
 
 
-def execute(  # type: ignore[misc]
+def reconcile(
     module: AnsibleModule,
-    api_slug: str,
+    authentik: Authentik,
     pk_name: str,
     search_query: dict[str, str] | None,
     desired_value: dict[str, Any],
@@ -181,12 +730,19 @@ def execute(  # type: ignore[misc]
         [dict[str, Any] | None, dict[str, Any] | None], bool
     ] = _compare,
     find: Callable[[Authentik], dict[str, Any] | None] | None = None,
-) -> NoReturn:
+) -> dict[str, Any]:
     """
     Ensure the selected Authentik resource is in the desired state.
 
+    This is the same as :func:`execute`, but returns the result instead of
+    exiting the module, which allows reconciling multiple resources in a
+    single module run.
+
+    When the module has a ``fingerprint_cache``, resources that were recently
+    verified to be in the same desired state are not checked again.
+
     :param module: The ansible module
-    :param api_slug: The api path for the resource
+    :param authentik: The client for the type of resource to reconcile
     :param pk_name: The name of the unique id when resource can be uniquely
                     identified by one
     :param search_query: The query used to search for the selected entry if the
@@ -194,13 +750,73 @@ def execute(  # type: ignore[misc]
     :param desired_value: The wanted value
     :param state: The state in which we want the value. Absent will delete it
                   if it exists. If 'present', this acts as a PATCH query, and
-                  updates the current value without modifying non-specified
-                  fields.
+                  only sends the fields that differ from the current value.
     :param find: If there is no API to find the exact value, this can be a
                  callable that returns the value while talking to the API.
+    :return: The result of the reconciliation, as expected by exit_json
     """
-    authentik = Authentik(module, api_slug)
+    if not module.params.get("fingerprint_cache"):
+        return _reconcile(
+            module,
+            authentik,
+            pk_name,
+            search_query,
+            desired_value,
+            state,
+            compare,
+            find,
+        )
 
+    cache = get_fingerprint_cache(
+        module.params["fingerprint_cache"], module.params["fingerprint_ttl"]
+    )
+    if pk := desired_value.get(pk_name):
+        identity: Any = {pk_name: pk}
+    elif search_query is not None:
+        identity = search_query
+    else:
+        # Without a better way to identify it, changing it makes a new one
+        identity = desired_value
+    key = authentik.fingerprint_key(identity)
+    desired = {"state": state, "value": desired_value}
+
+    if not module.params["force_verify"]:
+        entry = cache.lookup(key, desired)
+        if entry is not None:
+            return {
+                "changed": False,
+                "msg": "entry is up to date, as recently verified",
+                "data": entry["data"],
+            }
+
+    result = _reconcile(
+        module,
+        authentik,
+        pk_name,
+        search_query,
+        desired_value,
+        state,
+        compare,
+        find,
+    )
+    # In check mode, changes were not applied
+    if not (result["changed"] and module.check_mode):
+        cache.record(key, desired, result["data"])
+    return result
+
+
+def _reconcile(
+    module: AnsibleModule,
+    authentik: Authentik,
+    pk_name: str,
+    search_query: dict[str, str] | None,
+    desired_value: dict[str, Any],
+    state: Literal["absent", "present"],
+    compare: Callable[
+        [dict[str, Any] | None, dict[str, Any] | None], bool
+    ] = _compare,
+    find: Callable[[Authentik], dict[str, Any] | None] | None = None,
+) -> dict[str, Any]:
     if pk := desired_value.get(pk_name):
         existing_value = authentik.get(pk)
     elif find is not None:
@@ -208,31 +824,28 @@ def execute(  # type: ignore[misc]
     elif search_query is not None:
         existing_value = authentik.get_one(search_query)
     else:
-        module.fail_json(
-            msg="No search query provided, no custom find method and no primary key.",
+        fail(
+            module,
+            "No search query provided, no custom find method and no primary key.",
         )
 
     if state == "absent":
         if existing_value is None:  # pylint: disable=possibly-used-before-assignment
-            module.exit_json(
-                changed=False,
-                msg="entry is already absent",
-                data=None,
-            )
-
-        # mypy is not smart enough to understand the above exit_json
-        # doesn't return
-        assert existing_value is not None
+            return {
+                "changed": False,
+                "msg": "entry is already absent",
+                "data": None,
+            }
 
         if not module.check_mode:
             authentik.delete(existing_value[pk_name])
 
-        module.exit_json(
-            changed=True,
-            diff={"before": existing_value, "after": None},
-            msg="entry deleted.",
-            data=None,
-        )
+        return {
+            "changed": True,
+            "diff": {"before": existing_value, "after": None},
+            "msg": "entry deleted.",
+            "data": None,
+        }
 
     if existing_value is None:
         final_value = desired_value
@@ -240,21 +853,75 @@ def execute(  # type: ignore[misc]
         final_value = existing_value | desired_value
 
     if compare(existing_value, final_value):
-        module.exit_json(
-            changed=False,
-            msg="entry is up to date",
-            data=final_value,
-        )
+        return {
+            "changed": False,
+            "msg": "entry is up to date",
+            "data": final_value,
+        }
 
     if not module.check_mode:
         if existing_value is None:
             final_value = authentik.create(final_value)
         else:
-            final_value = authentik.update(final_value[pk_name], final_value)
+            # Only send what changed, the resource can contain large read-only
+            # fields that the server would otherwise need to validate
+            final_value = authentik.patch(
+                existing_value[pk_name],
+                {
+                    key: value
+                    for key, value in desired_value.items()
+                    if key not in existing_value
+                    or existing_value[key] != value
+                },
+            )
+
+    return {
+        "changed": True,
+        "diff": {"before": existing_value, "after": final_value},
+        "msg": "entry updated",
+        "data": final_value,
+    }
+
 
-    module.exit_json(
-        changed=True,
-        diff={"before": existing_value, "after": final_value},
-        msg="entry updated",
-        data=final_value,
+def execute(
+    module: AnsibleModule,
+    api_slug: str,
+    pk_name: str,
+    search_query: dict[str, str] | None,
+    desired_value: dict[str, Any],
+    state: Literal["absent", "present"],
+    compare: Callable[
+        [dict[str, Any] | None, dict[str, Any] | None], bool
+    ] = _compare,
+    find: Callable[[Authentik], dict[str, Any] | None] | None = None,
+) -> NoReturn:
+    """
+    Ensure the selected Authentik resource is in the desired state.
+
+    :param module: The ansible module
+    :param api_slug: The api path for the resource
+    :param pk_name: The name of the unique id when resource can be uniquely
+                    identified by one
+    :param search_query: The query used to search for the selected entry if the
+                         primary key is not otherwise known
+    :param desired_value: The wanted value
+    :param state: The state in which we want the value. Absent will delete it
+                  if it exists. If 'present', this acts as a PATCH query, and
+                  updates the current value without modifying non-specified
+                  fields.
+    :param find: If there is no API to find the exact value, this can be a
+                 callable that returns the value while talking to the API.
+    """
+    authentik = Authentik(module, api_slug)
+    authentik.exit_json(
+        **reconcile(
+            module,
+            authentik,
+            pk_name,
+            search_query,
+            desired_value,
+            state,
+            compare=compare,
+            find=find,
+        )
     )
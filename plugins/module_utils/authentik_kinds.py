@@ -0,0 +1,486 @@
+"""This module describes the kinds of Authentik resources to reconcile."""
+
+import operator
+import threading
+import weakref
+from collections.abc import Callable, Collection
+from typing import Any, Literal, NamedTuple, cast
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
+    Authentik,
+    project,
+    reconcile,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    fail,
+    run_concurrently,
+)
+
+
+def compare_provider_oauth2(
+    existing: dict[str, Any] | None, final: dict[str, Any] | None
+) -> bool:
+    """
+    Compare OAuth2 providers, ignoring the order of their property mappings.
+
+    :param existing: The provider as it currently is on the server
+    :param final: The provider as it should be
+    :return: Whether both are equal
+    """
+    if existing is not None:
+        existing["property_mappings"] = sorted(existing["property_mappings"])
+    if final is not None:
+        final["property_mappings"] = sorted(final["property_mappings"])
+    return existing == final
+
+
+# What a policy binding can bind to a target, in the order in which they are
+# used to identify the binding
+_BINDING_KEYS = ["policy", "group", "user"]
+
+
+def policy_binding_key(binding: dict[str, Any]) -> tuple[str, str] | None:
+    """
+    Get what a policy binding binds to its target.
+
+    :param binding: The policy binding
+    :return: The field and the value of the policy, group or user bound, or
+             None if the binding binds nothing
+    """
+    for key in _BINDING_KEYS:
+        if binding.get(key) is not None:
+            # Users are identified by integers, which are passed as strings
+            return key, str(binding[key])
+    return None
+
+
+def find_policy_binding(
+    authentik: Authentik, binding: dict[str, Any]
+) -> dict[str, Any] | None:
+    """
+    Find the existing policy binding matching the provided one.
+
+    The bindings of the target are searched for the policy, group or user
+    bound. Results are checked again locally, in case the server ignores
+    some filters.
+
+    :param authentik: The client for policy bindings
+    :param binding: The binding to search for
+    :return: The existing binding, if any
+    """
+    key = policy_binding_key(binding)
+    if key is None:
+        return None
+
+    for result in authentik.iterate(
+        {"target": binding["target"], key[0]: key[1]}
+    ):
+        if policy_binding_key(result) == key:
+            return cast("dict[str, Any]", result)
+    return None
+
+
+class PolicyBindingIndex:
+    """
+    An index of the policy bindings of targets, by what they bind.
+
+    All the bindings of a target are fetched once, the first time one of them
+    is looked up, and reused for all following lookups on the same target.
+    This makes reconciling many bindings of the same target, as a batch, need
+    a single scan.
+
+    Bindings created or deleted after the bindings of a target were fetched
+    are not reflected.
+
+    Use :func:`get_policy_binding_index` to share an index across the whole
+    module run.
+
+    :param authentik: The client for policy bindings
+    """
+
+    def __init__(self, authentik: Authentik) -> None:
+        self._authentik = authentik
+        self._lock = threading.Lock()
+        self._target_locks: dict[str, threading.Lock] = {}
+        self._targets: dict[str, dict[tuple[str, str], dict[str, Any]]] = {}
+
+    def _bindings(self, target: str) -> dict[tuple[str, str], dict[str, Any]]:
+        with self._lock:
+            target_lock = self._target_locks.setdefault(
+                target, threading.Lock()
+            )
+
+        # Concurrent lookups for the same target wait for a single scan
+        with target_lock:
+            if target not in self._targets:
+                index: dict[tuple[str, str], dict[str, Any]] = {}
+                for result in self._authentik.iterate({"target": target}):
+                    key = policy_binding_key(result)
+                    if key is not None:
+                        index.setdefault(key, result)
+                self._targets[target] = index
+            return self._targets[target]
+
+    def find(self, binding: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        Find the existing policy binding matching the provided one.
+
+        :param binding: The binding to search for
+        :return: The existing binding, if any
+        """
+        key = policy_binding_key(binding)
+        if key is None:
+            return None
+        return self._bindings(binding["target"]).get(key)
+
+
+_POLICY_BINDING_INDEXES: weakref.WeakKeyDictionary[
+    Authentik, PolicyBindingIndex
+] = weakref.WeakKeyDictionary()
+# Indexes are requested from worker threads, and must only be created once
+_POLICY_BINDING_INDEXES_LOCK = threading.Lock()
+
+
+def get_policy_binding_index(authentik: Authentik) -> PolicyBindingIndex:
+    """
+    Get the index of the policy bindings fetched through the given client.
+
+    :param authentik: The client for policy bindings
+    :return: The index
+    """
+    with _POLICY_BINDING_INDEXES_LOCK:
+        if authentik not in _POLICY_BINDING_INDEXES:
+            _POLICY_BINDING_INDEXES[authentik] = PolicyBindingIndex(authentik)
+        return _POLICY_BINDING_INDEXES[authentik]
+
+
+def find_indexed_policy_binding(
+    authentik: Authentik, binding: dict[str, Any]
+) -> dict[str, Any] | None:
+    """
+    Find the existing policy binding matching the provided one, in the index.
+
+    This is meant for batches of bindings, see :class:`PolicyBindingIndex`.
+
+    :param authentik: The client for policy bindings
+    :param binding: The binding to search for
+    :return: The existing binding, if any
+    """
+    return get_policy_binding_index(authentik).find(binding)
+
+
+def _plan_policy_bindings(
+    module: AnsibleModule,
+    existing: list[dict[str, Any]],
+    target: str,
+    bindings: list[dict[str, Any]],
+    *,
+    exclusive: Collection[str],
+) -> list[tuple[str, dict[str, Any], dict[str, Any] | None]]:
+    """
+    Compute the changes needed for the target to have the desired bindings.
+
+    :param module: The ansible module
+    :param existing: The bindings the target currently has
+    :param target: The pk of the target
+    :param bindings: The bindings the target should have
+    :param exclusive: What bindings that are not desired to delete, among
+                      the ones binding a ``group``, ``policy`` or ``user``
+    :return: For each binding, whether to ``create``, ``update``, ``delete``
+             or ``keep`` it, the binding and, for updates, the changed fields
+    """
+    by_key = {policy_binding_key(binding): binding for binding in existing}
+
+    plan: list[tuple[str, dict[str, Any], dict[str, Any] | None]] = []
+    seen = set()
+    for desired in bindings:
+        key = policy_binding_key(desired)
+        # Callers require one of the group, policy or user
+        assert key is not None
+        if key in seen:
+            fail(
+                module,
+                f"The {key[0]} {key[1]} is bound multiple times",
+                binding=desired,
+            )
+        seen.add(key)
+
+        current = by_key.pop(key, None)
+        if current is None:
+            plan.append(("create", {**desired, "target": target}, None))
+            continue
+
+        # Keep the bound value as returned by the server, users are integers
+        changes = {
+            field: value
+            for field, value in desired.items()
+            if field != key[0] and current.get(field) != value
+        }
+        if changes:
+            plan.append(("update", current, changes))
+        else:
+            plan.append(("keep", current, None))
+
+    plan.extend(
+        ("delete", binding, None)
+        for key, binding in by_key.items()
+        if key is not None and key[0] in exclusive
+    )
+    return plan
+
+
+def sync_policy_bindings(
+    module: AnsibleModule,
+    authentik: Authentik,
+    target: str,
+    bindings: list[dict[str, Any]],
+    *,
+    exclusive: Collection[str] = (),
+) -> dict[str, Any]:
+    """
+    Ensure the target has the provided policy bindings.
+
+    The existing bindings of the target are fetched once, and the bindings to
+    create, update and delete are then applied concurrently. Bindings are
+    identified by what they bind, see :func:`policy_binding_key`.
+
+    Other bindings are only deleted if they bind one of the kinds listed in
+    ``exclusive``, so that bindings managed elsewhere are kept by default.
+
+    :param module: The ansible module
+    :param authentik: The client for policy bindings
+    :param target: The pk of the flow or application whose bindings to manage
+    :param bindings: The bindings the target should have
+    :param exclusive: What bindings that are not provided to delete, among
+                      the ones binding a ``group``, ``policy`` or ``user``
+    :return: The result, with the final ``bindings``, and the ``created``,
+             ``updated`` and ``deleted`` ones, projected with
+             :func:`project`
+    """
+    existing = list(authentik.iterate({"target": target}))
+    plan = _plan_policy_bindings(
+        module, existing, target, bindings, exclusive=exclusive
+    )
+
+    def _apply(
+        step: tuple[str, dict[str, Any], dict[str, Any] | None],
+    ) -> dict[str, Any] | None:
+        action, binding, changes = step
+        if module.check_mode or action == "keep":
+            return binding if changes is None else binding | changes
+        if action == "create":
+            return cast("dict[str, Any]", authentik.create(binding))
+        if action == "update":
+            assert changes is not None
+            return cast(
+                "dict[str, Any]", authentik.patch(binding["pk"], changes)
+            )
+        authentik.delete(binding["pk"])
+        return None
+
+    results = run_concurrently(module, _apply, plan)
+
+    fields = module.params["return_fields"]
+    changes: dict[str, list[dict[str, Any]]] = {
+        "create": [],
+        "update": [],
+        "delete": [],
+    }
+    final = []
+    for (action, binding, _), result in zip(plan, results, strict=True):
+        if action in changes:
+            changes[action].append(
+                project(result if result is not None else binding, fields)
+            )
+        if action != "delete":
+            assert result is not None
+            final.append(project(result, fields))
+
+    return {
+        "changed": any(changes.values()),
+        "diff": {
+            "before": [project(binding, fields) for binding in existing],
+            "after": final,
+        },
+        "bindings": final,
+        "created": changes["create"],
+        "updated": changes["update"],
+        "deleted": changes["delete"],
+    }
+
+
+def _merge_providers(
+    providers: list[int],
+    provider_pks: list[int],
+    state: Literal["absent", "present"],
+) -> list[int]:
+    if state == "absent":
+        return [pk for pk in providers if pk not in provider_pks]
+    return providers + [pk for pk in provider_pks if pk not in providers]
+
+
+def register_outpost_providers(
+    module: AnsibleModule,
+    authentik: Authentik,
+    outpost: dict[str, Any],
+    provider_pks: list[int],
+    state: Literal["absent", "present"],
+) -> dict[str, Any]:
+    """
+    Ensure the providers are, or are not, served by the outpost.
+
+    The API only allows replacing the whole list of providers of an outpost,
+    which is computed from the outpost as provided. Another run updating the
+    same outpost after it was read can thus overwrite this update, or have
+    its own overwritten, with both reporting success. Such updates should be
+    batched in a single call, or serialized.
+
+    :param module: The ansible module
+    :param authentik: The client for outposts
+    :param outpost: The outpost, as currently on the server
+    :param provider_pks: The providers to add or remove
+    :param state: Whether to add or remove the providers
+    :return: The result of the update, as expected by exit_json
+    """
+    providers = _merge_providers(outpost["providers"], provider_pks, state)
+    if providers == outpost["providers"]:
+        return {"changed": False, "data": outpost}
+
+    if module.check_mode:
+        final_state = {**outpost, "providers": providers}
+    else:
+        final_state = cast(
+            "dict[str, Any]",
+            authentik.patch(outpost["pk"], {"providers": providers}),
+        )
+
+    return {
+        "changed": True,
+        "diff": {"before": outpost, "after": final_state},
+        "msg": "provider removed" if state == "absent" else "provider added",
+        "data": final_state,
+    }
+
+
+class ResourceKind(NamedTuple):
+    """
+    Describes how to reconcile a type of Authentik resource.
+
+    :param api_slug: The api path for the resource
+    :param pk_name: The name of the unique id of the resource
+    :param search_keys: A mapping of query parameters to the field of the
+                        resource to use to search for it, when the primary key
+                        is not known
+    :param compare: A custom comparison function, see :func:`execute`
+    :param find: A custom function to find the resource, taking the client
+                 and the desired value
+    """
+
+    api_slug: str
+    pk_name: str
+    search_keys: dict[str, str] | None = None
+    compare: Callable[[dict[str, Any] | None, dict[str, Any] | None], bool] = (
+        operator.eq
+    )
+    find: (
+        Callable[[Authentik, dict[str, Any]], dict[str, Any] | None] | None
+    ) = None
+
+
+RESOURCE_KINDS = {
+    "application": ResourceKind("/api/v3/core/applications/", "slug"),
+    "group": ResourceKind("/api/v3/core/groups/", "pk", {"name": "name"}),
+    "outpost": ResourceKind(
+        "/api/v3/outposts/instances/", "pk", {"name__iexact": "name"}
+    ),
+    "policy_binding": ResourceKind(
+        "/api/v3/policies/bindings/", "pk", find=find_indexed_policy_binding
+    ),
+    "propertymappings_scope": ResourceKind(
+        "/api/v3/propertymappings/provider/scope/", "pk", {"name": "name"}
+    ),
+    "provider_oauth2": ResourceKind(
+        "/api/v3/providers/oauth2/",
+        "pk",
+        {"name": "name"},
+        compare=compare_provider_oauth2,
+    ),
+    "provider_proxy": ResourceKind(
+        "/api/v3/providers/proxy/", "pk", {"name__iexact": "name"}
+    ),
+    "token": ResourceKind("/api/v3/core/tokens/", "identifier"),
+    "user": ResourceKind(
+        "/api/v3/core/users/", "pk", {"username": "username"}
+    ),
+}
+
+
+# The api path and the query parameter to look up each kind of resource by
+# its name
+NAMED_KINDS = {
+    "application": ("/api/v3/core/applications/", "slug"),
+    "certificate": ("/api/v3/crypto/certificatekeypairs/", "name"),
+    "flow": ("/api/v3/flows/instances/", "slug"),
+    "group": ("/api/v3/core/groups/", "name"),
+    "outpost": ("/api/v3/outposts/instances/", "name__iexact"),
+    "provider_oauth2": ("/api/v3/providers/oauth2/", "name"),
+    "provider_proxy": ("/api/v3/providers/proxy/", "name__iexact"),
+    "scope": ("/api/v3/propertymappings/provider/scope/", "scope_name"),
+    "user": ("/api/v3/core/users/", "username"),
+}
+
+
+def reconcile_kind(
+    module: AnsibleModule,
+    authentik: Authentik,
+    kind: ResourceKind,
+    desired_value: dict[str, Any],
+    state: Literal["absent", "present"],
+) -> dict[str, Any]:
+    """
+    Ensure the Authentik resource of the given kind is in the desired state.
+
+    :param module: The ansible module
+    :param authentik: The client for the kind of resource to reconcile
+    :param kind: The kind of resource to reconcile
+    :param desired_value: The wanted value
+    :param state: The state in which we want the value, see :func:`execute`
+    :return: The result of the reconciliation, see :func:`reconcile`
+    """
+    search_query = None
+    if kind.search_keys is not None:
+        missing = [
+            key
+            for key in kind.search_keys.values()
+            if key not in desired_value
+        ]
+        if missing:
+            fail(
+                module,
+                f"Missing fields to identify the resource: {missing}",
+                desired=desired_value,
+            )
+
+        search_query = {
+            param: desired_value[key]
+            for param, key in kind.search_keys.items()
+        }
+
+    def find(authentik: Authentik) -> dict[str, Any] | None:
+        assert kind.find is not None
+        return kind.find(authentik, desired_value)
+
+    return cast(
+        "dict[str, Any]",
+        reconcile(
+            module,
+            authentik,
+            kind.pk_name,
+            search_query,
+            desired_value,
+            state,
+            compare=kind.compare,
+            find=find if kind.find is not None else None,
+        ),
+    )
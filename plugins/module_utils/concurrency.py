@@ -0,0 +1,125 @@
+"""This module provides utilities to run the work of modules concurrently."""
+
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NoReturn, TypeVar
+
+from ansible.module_utils.basic import AnsibleModule
+
+# The default number of items processed at the same time, for the modules
+# accepting a ``max_concurrency`` option
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class WorkerError(Exception):
+    """
+    An error that happened in a worker thread, to report from the main one.
+
+    :param msg: The message explaining the error
+    :param kwargs: Additional information to report with the error
+    """
+
+    def __init__(self, msg: str, **kwargs: Any) -> None:
+        super().__init__(msg)
+        self.msg = msg
+        self.kwargs = kwargs
+
+
+_WORKER = threading.local()
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def fail(  # type: ignore[misc]
+    module: AnsibleModule, msg: str, **kwargs: Any
+) -> NoReturn:
+    """
+    Fail the module with the provided message.
+
+    When called from a worker of :func:`run_concurrently`, this raises a
+    :class:`WorkerError` instead, so that the error can be reported from the
+    main thread.
+
+    :param module: The ansible module
+    :param msg: The message explaining the error
+    :param kwargs: Additional information to report with the error
+    :raise WorkerError: when running in a worker thread
+    """
+    if getattr(_WORKER, "active", False):
+        raise WorkerError(msg, **kwargs)
+    module.fail_json(msg=msg, **kwargs)
+
+
+class WorkerModule:
+    """
+    Wrap an ansible module, for helpers that can fail it.
+
+    Helpers like :func:`ansible.module_utils.urls.fetch_url` call
+    ``fail_json`` on errors, which would exit the process from a worker
+    thread. On the wrapper, this goes through :func:`fail` instead, the rest
+    being forwarded to the module.
+
+    :param module: The ansible module
+    """
+
+    def __init__(self, module: AnsibleModule) -> None:
+        self._module = module
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Get the attribute of the wrapped module.
+
+        :param name: The name of the attribute
+        :return: The attribute of the module
+        """
+        return getattr(self._module, name)
+
+    def fail_json(self, msg: str, **kwargs: Any) -> NoReturn:
+        """
+        Fail the module, see :func:`fail`.
+
+        :param msg: The message explaining the error
+        :param kwargs: Additional information to report with the error
+        """
+        fail(self._module, msg, **kwargs)
+
+
+# Module utils run on the managed hosts, so avoid syntax needing Python 3.12
+def run_concurrently(  # noqa: UP047
+    module: AnsibleModule, func: Callable[[_T], _R], items: Iterable[_T]
+) -> list[_R]:
+    """
+    Run the provided function on every item, concurrently.
+
+    At most ``max_concurrency`` items are processed at the same time. All
+    items are processed even if some fail, and the error for the first
+    failed item, in the order provided, is then reported. This keeps both
+    the results and the errors deterministic. This can be nested, for
+    example to process the items of each item concurrently.
+
+    :param module: The ansible module, which must accept ``max_concurrency``
+    :param func: The function to run on every item
+    :param items: The items to process
+    :return: The result for each item, in the same order as provided
+    """
+
+    def _run(item: _T) -> _R:
+        _WORKER.active = True
+        try:
+            return func(item)
+        finally:
+            _WORKER.active = False
+
+    with ThreadPoolExecutor(module.params["max_concurrency"]) as executor:
+        futures = [executor.submit(_run, item) for item in items]
+
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except WorkerError as exc:
+            # This raises again when nested in another worker
+            fail(module, exc.msg, **exc.kwargs)
+    return results
@@ -0,0 +1,577 @@
+"""This module provides a pool of persistent HTTP connections."""
+
+import base64
+import http.client
+import select
+import socket
+import ssl
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from types import TracebackType
+from typing import Any, cast
+from urllib.parse import SplitResult, unquote, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+# Up to how many bytes to read from a response closed early, in order to keep
+# its connection alive rather than having to open a new one
+_DRAIN_LIMIT = 65536
+
+_COMPRESSED_ENCODINGS = {"deflate", "gzip", "x-gzip"}
+
+# The methods that can safely be sent again when a kept-alive connection
+# turns out to have been closed by the server
+_IDEMPOTENT_METHODS = {"DELETE", "GET", "HEAD", "OPTIONS", "PUT"}
+
+
+class _HTTPConnection(http.client.HTTPConnection):
+    """
+    An HTTP connection that records how long it took to connect.
+
+    The time spent resolving the host and opening the TCP connection are
+    stored, in seconds, in the ``dns`` and ``connect`` entries of
+    :attr:`timings`, which the pool replaces before every request.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.timings: dict[str, float] = {}
+
+    def connect(self) -> None:
+        """Connect to the server, timing the DNS resolution and connection."""
+        start = time.perf_counter()
+        addresses = socket.getaddrinfo(
+            self.host, self.port, type=socket.SOCK_STREAM
+        )
+        resolved = time.perf_counter()
+        self.timings["dns"] = resolved - start
+
+        error = OSError(f"Could not resolve {self.host}")
+        for *_, address in addresses:
+            try:
+                self.sock = socket.create_connection(
+                    (cast("str", address[0]), cast("int", address[1])),
+                    self.timeout,
+                )
+            except OSError as exc:
+                error = exc
+            else:
+                break
+        else:
+            raise error
+
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self._tunnel_host:  # type: ignore[attr-defined]
+            self._tunnel()  # type: ignore[attr-defined]
+        self.timings["connect"] = time.perf_counter() - resolved
+
+
+class _HTTPSConnection(_HTTPConnection, http.client.HTTPSConnection):
+    """
+    An HTTPS connection that resumes the last TLS session of its pool.
+
+    The time spent on the TLS handshake is stored in the ``tls`` entry of
+    :attr:`timings`.
+
+    :param pool: The pool this connection belongs to
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int | None,
+        *,
+        context: ssl.SSLContext,
+        timeout: float,
+        pool: "ConnectionPool",
+    ) -> None:
+        super().__init__(host, port, timeout=timeout, context=context)
+        self._pool = pool
+
+    def connect(self) -> None:
+        """Connect to the server, reusing a previous TLS session if any."""
+        super().connect()
+        start = time.perf_counter()
+        self.sock = self._context.wrap_socket(  # type: ignore[attr-defined]
+            self.sock,
+            server_hostname=self._tunnel_host or self.host,  # type: ignore[attr-defined]
+            session=self._pool.tls_session,
+        )
+        self.timings["tls"] = time.perf_counter() - start
+        if self.sock.session_reused:
+            with self._pool.lock:
+                self._pool.tls_sessions_resumed += 1
+
+
+def _get_proxy(scheme: str, host: str) -> SplitResult | None:
+    """
+    Get the proxy to go through to reach the given host.
+
+    Like :func:`ansible.module_utils.urls.fetch_url`, this honours the
+    ``http_proxy``, ``https_proxy`` and ``no_proxy`` environment variables.
+
+    :param scheme: The scheme of the url to contact
+    :param host: The host to contact
+    :return: The url of the proxy, if one should be used
+    """
+    proxy = getproxies().get(scheme)
+    if not proxy or proxy_bypass(host):
+        return None
+    if "://" not in proxy:
+        proxy = f"http://{proxy}"
+    return urlsplit(proxy)
+
+
+def _is_dropped(connection: _HTTPConnection) -> bool:
+    """
+    Check whether an idle connection was closed by the server.
+
+    Nothing is expected from the server on an idle connection, so it being
+    readable means it was closed, or is about to be.
+
+    :param connection: The idle connection to check
+    :return: Whether the connection can't be used anymore
+    """
+    if connection.sock is None:
+        return True
+    readable, _, _ = select.select([connection.sock], [], [], 0)
+    return bool(readable)
+
+
+class PooledResponse:
+    """
+    The body of a response, read from a connection of a pool.
+
+    Bodies compressed with gzip or deflate are decompressed while being read.
+    The number of bytes actually received is available in
+    :attr:`bytes_received`.
+
+    The connection goes back to the pool once the body was entirely read. If
+    the response is closed before, the rest of the body is read and discarded
+    when it is small enough, otherwise the connection is closed.
+
+    :param response: The response to read
+    :param connection: The connection the response is read from
+    :param release: Called with the connection to give it back to the pool
+    """
+
+    def __init__(
+        self,
+        response: http.client.HTTPResponse,
+        connection: _HTTPConnection,
+        release: Callable[[_HTTPConnection], None],
+    ) -> None:
+        self._response = response
+        self._connection: _HTTPConnection | None = connection
+        self._release = release
+        self.bytes_received = 0
+
+        self._encoding = (
+            response.getheader("Content-Encoding", "").strip().lower()
+        )
+        self._decompressor = None
+        if self._encoding in _COMPRESSED_ENCODINGS:
+            # Detect whether the stream has a gzip or a zlib header
+            self._decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32)
+
+    def _done(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        if self._response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+
+    def _abort(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
+
+    def _read_raw(self, size: int) -> bytes:
+        data = self._response.read(size if size >= 0 else None)
+        self.bytes_received += len(data)
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read the body of the response.
+
+        :param size: The maximum number of bytes to read, all if negative
+        :return: The bytes read, empty once the whole body was read
+        :raise OSError: if the server could not be contacted
+        :raise http.client.HTTPException: if the server misbehaved
+        """
+        try:
+            if self._decompressor is None:
+                data = self._read_raw(size)
+            else:
+                # A chunk can be too small to decompress anything by itself
+                data = b""
+                while not data:
+                    # Leftovers from the previous read come first
+                    raw = self._decompressor.unconsumed_tail
+                    if not raw:
+                        raw = self._read_raw(size)
+                    if not raw:
+                        data = self._decompressor.flush()
+                        break
+                    data = self._decompressor.decompress(raw, max(size, 0))
+        except zlib.error as exc:
+            self._abort()
+            msg = f"Invalid {self._encoding} encoded response: {exc}"
+            raise http.client.HTTPException(msg) from exc
+        except BaseException:
+            self._abort()
+            raise
+
+        if self._response.isclosed():
+            self._done()
+        return data
+
+    def close(self) -> None:
+        """Stop reading the response, and release its connection."""
+        if self._connection is None:
+            return
+
+        remaining = self._response.length
+        if remaining is None or remaining > _DRAIN_LIMIT:
+            self._abort()
+            return
+
+        try:
+            self.bytes_received += len(self._response.read())
+        except (OSError, http.client.HTTPException):
+            self._abort()
+        else:
+            self._done()
+
+    def __enter__(self) -> "PooledResponse":  # noqa: PYI034
+        """
+        Use the response as a context manager, closing it on exit.
+
+        :return: The response
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the response."""
+        self.close()
+
+
+class ConnectionPool:  # pylint: disable=too-many-instance-attributes
+    """
+    A small pool of persistent HTTP/1.1 connections to a single server.
+
+    Connections are kept alive between requests, so that a module doing
+    multiple calls only pays for the TCP and TLS handshakes once. When a new
+    connection is needed, the last TLS session is resumed where possible.
+
+    Responses are requested compressed, unless the request specifies an
+    ``Accept-Encoding`` header, and are transparently decompressed.
+
+    The proxy set in the ``http_proxy`` or ``https_proxy`` environment
+    variables is used, unless the server is listed in ``no_proxy``. HTTPS
+    requests are tunnelled through it.
+
+    Use :func:`get_connection_pool` to share a pool for a given server across
+    the whole module run.
+
+    :param url: The base url of the server
+    :param ca_path: PEM file containing the CA certificates to trust
+    :param validate_certs: Whether to validate the server's certificate
+    :param timeout: The timeout for each socket operation
+    :param max_size: The maximum number of idle connections to keep around.
+                     This should match the number of concurrent requests
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ca_path: str | None,
+        validate_certs: bool,
+        timeout: float,
+        max_size: int = 1,
+    ) -> None:
+        parsed = urlsplit(url)
+        self._scheme = parsed.scheme
+        self._host = cast("str", parsed.hostname)
+        self._port = parsed.port
+        self._timeout = timeout
+        self.max_size = max_size
+
+        self._context: ssl.SSLContext | None = None
+        if self._scheme == "https":
+            self._context = ssl.create_default_context(cafile=ca_path)
+            if not validate_certs:
+                self._context.check_hostname = False
+                self._context.verify_mode = ssl.CERT_NONE
+
+        self._proxy = _get_proxy(self._scheme, self._host)
+        self._proxy_headers = {}
+        if self._proxy is not None and self._proxy.username is not None:
+            credentials = base64.b64encode(
+                f"{unquote(self._proxy.username)}:"
+                f"{unquote(self._proxy.password or '')}".encode()
+            ).decode()
+            self._proxy_headers["Proxy-Authorization"] = f"Basic {credentials}"
+
+        self._idle: list[_HTTPConnection] = []
+        self.lock = threading.Lock()
+
+        self.tls_session: ssl.SSLSession | None = None
+        self.requests = 0
+        self.handshakes = 0
+        self.tls_sessions_resumed = 0
+
+    def _new_connection(self) -> _HTTPConnection:
+        self.handshakes += 1
+        host, port = self._host, self._port
+        if self._proxy is not None:
+            host = cast("str", self._proxy.hostname)
+            port = self._proxy.port or 80
+
+        if self._context is None:
+            return _HTTPConnection(host, port, timeout=self._timeout)
+
+        connection = _HTTPSConnection(
+            host,
+            port,
+            context=self._context,
+            timeout=self._timeout,
+            pool=self,
+        )
+        if self._proxy is not None:
+            connection.set_tunnel(self._host, self._port, self._proxy_headers)
+        return connection
+
+    def _acquire(self) -> tuple[_HTTPConnection, bool]:
+        with self.lock:
+            self.requests += 1
+            while self._idle:
+                connection = self._idle.pop()
+                if not _is_dropped(connection):
+                    return connection, True
+                connection.close()
+            return self._new_connection(), False
+
+    def _release(self, connection: _HTTPConnection) -> None:
+        if isinstance(connection.sock, ssl.SSLSocket):
+            self.tls_session = connection.sock.session
+
+        with self.lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timings: dict[str, float] | None = None,
+    ) -> tuple[int, http.client.HTTPMessage, PooledResponse]:
+        """
+        Send a request to the server, without reading the response's body.
+
+        The body must then be read, or the response closed, for the connection
+        to be reused.
+
+        :param method: The http method to use
+        :param url: The url to contact, only the path and query are used
+        :param body: The body to send along the request
+        :param headers: The headers to send along the request
+        :param timings: If provided, this is filled with the time spent, in
+                        seconds, resolving the host (``dns``), connecting
+                        (``connect``), doing the TLS handshake (``tls``) and
+                        waiting for the response (``first_byte``). The first
+                        three are only set when a new connection was opened.
+        :return: The status and headers of the response, and its body
+        :raise OSError: if the server could not be contacted
+        :raise http.client.HTTPException: if the server misbehaved
+        """
+        parsed = urlsplit(url)
+        target = parsed.path
+        if parsed.query:
+            target += f"?{parsed.query}"
+
+        if timings is None:
+            timings = {}
+
+        headers = {"Accept-Encoding": "gzip, deflate", **(headers or {})}
+        if self._proxy is not None and self._context is None:
+            # Plain HTTP proxies expect the full url of the resource
+            target = f"http://{parsed.netloc}{target}"
+            headers.update(self._proxy_headers)
+
+        connection, reused = self._acquire()
+        try:
+            try:
+                connection.timings = timings
+                start = time.perf_counter()
+                connection.request(method, target, body, headers)
+                response = connection.getresponse()
+            except (
+                http.client.RemoteDisconnected,
+                ConnectionResetError,
+                BrokenPipeError,
+            ):
+                # The server closed an idle connection, try again on a new one.
+                # The request might have been processed already, so only do
+                # this when sending it twice is harmless.
+                if not reused or method not in _IDEMPOTENT_METHODS:
+                    raise
+                connection.close()
+                with self.lock:
+                    connection = self._new_connection()
+                connection.timings = timings
+                start = time.perf_counter()
+                connection.request(method, target, body, headers)
+                response = connection.getresponse()
+        except BaseException:
+            connection.close()
+            raise
+
+        # Only count the time spent waiting for the server
+        timings["first_byte"] = (
+            time.perf_counter()
+            - start
+            - sum(timings.get(key, 0) for key in ["dns", "connect", "tls"])
+        )
+        return (
+            response.status,
+            response.headers,
+            PooledResponse(response, connection, self._release),
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timings: dict[str, float] | None = None,
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Send a request to the server, over a kept-alive connection if any.
+
+        :param method: The http method to use
+        :param url: The url to contact, only the path and query are used
+        :param body: The body to send along the request
+        :param headers: The headers to send along the request
+        :param timings: If provided, this is filled as for :meth:`open`
+        :return: The status, headers and body of the response
+        :raise OSError: if the server could not be contacted
+        :raise http.client.HTTPException: if the server misbehaved
+        """
+        status, response_headers, response = self.open(
+            method, url, body, headers, timings
+        )
+        with response:
+            return status, response_headers, response.read()
+
+    def close(self) -> None:
+        """Close the idle connections of the pool."""
+        with self.lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get statistics about the connections opened by this pool.
+
+        :return: The number of requests done, connections opened, handshakes
+                 avoided by reusing connections and TLS sessions resumed.
+        """
+        return {
+            "requests": self.requests,
+            "handshakes": self.handshakes,
+            "handshakes_avoided": self.requests - self.handshakes,
+            "tls_sessions_resumed": self.tls_sessions_resumed,
+        }
+
+
+# The codes with which the httpapi plugin reports why a request failed, as
+# only the message and code of an error go through the persistent connection.
+# This lets modules know which requests can be retried.
+_ERROR_CODES: dict[int, type[OSError]] = {
+    1: TimeoutError,
+    2: ConnectionRefusedError,
+    3: ConnectionError,
+}
+
+
+def get_error_code(exc: BaseException) -> int | None:
+    """
+    Get the code to report a failed request with.
+
+    :param exc: The error that made the request fail
+    :return: The code for the error, if it is a timeout or a connection error
+    """
+    for code, kind in _ERROR_CODES.items():
+        if isinstance(exc, kind):
+            return code
+    return None
+
+
+def get_error(code: int | None, msg: str) -> OSError | None:
+    """
+    Get the error corresponding to a code from :func:`get_error_code`.
+
+    :param code: The code with which the request failed
+    :param msg: The message explaining the error
+    :return: The error, if the code is known
+    """
+    if code not in _ERROR_CODES:
+        return None
+    return _ERROR_CODES[code](msg)
+
+
+_POOLS: dict[tuple[str, str | None, bool, float], ConnectionPool] = {}
+# Pools are requested from worker threads, and must only be created once
+_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(
+    url: str,
+    ca_path: str | None,
+    validate_certs: bool,
+    timeout: float,
+    max_size: int = 1,
+) -> ConnectionPool:
+    """
+    Get the connection pool to use to talk to the server at the given url.
+
+    Pools are shared for the whole process, so that all clients talking to the
+    same server with the same settings reuse the same connections.
+
+    :param url: The url of the server
+    :param ca_path: PEM file containing the CA certificates to trust
+    :param validate_certs: Whether to validate the server's certificate
+    :param timeout: The timeout for each socket operation
+    :param max_size: The minimum number of idle connections the pool should
+                     keep around
+    :return: The connection pool
+    """
+    parsed = urlsplit(url)
+    key = (
+        f"{parsed.scheme}://{parsed.netloc}",
+        ca_path,
+        validate_certs,
+        timeout,
+    )
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = ConnectionPool(*key, max_size=max_size)
+        pool = _POOLS[key]
+        pool.max_size = max(pool.max_size, max_size)
+        return pool
@@ -0,0 +1,153 @@
+"""This module provides a cache of the resources known to be up to date."""
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, cast
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Compute a stable hash of the provided value.
+
+    :param value: A value that can be serialized as JSON
+    :return: The hash of the value
+    """
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class FingerprintCache:
+    """
+    A store of the resources that were verified to be in their desired state.
+
+    For each resource, this records a fingerprint of the desired value, the
+    value last seen on the server and when it was verified. As long as the
+    desired value does not change, the resource can be trusted to still be up
+    to date for ``ttl`` seconds, without contacting the server.
+
+    Use :func:`get_fingerprint_cache` to share a cache for a given file across
+    the whole module run.
+
+    :param path: The file in which the fingerprints are stored
+    :param ttl: The number of seconds during which a verification is trusted
+    """
+
+    def __init__(self, path: str, ttl: int) -> None:
+        self._path = Path(path)
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._updates: dict[str, dict[str, Any]] = {}
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        try:
+            return cast(
+                "dict[str, dict[str, Any]]",
+                json.loads(self._path.read_text(encoding="utf-8")),
+            )
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            # The cache is only an optimization, start again from scratch
+            return {}
+
+    def lookup(self, key: str, desired: Any) -> dict[str, Any] | None:
+        """
+        Get the entry for the resource, if it can still be trusted.
+
+        :param key: The key identifying the resource
+        :param desired: The desired state of the resource
+        :return: The entry, with the value last seen on the server under
+                 ``data``, or None if the resource needs to be verified
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry["desired"] != fingerprint(desired):
+            return None
+        if time.time() - entry["verified"] > self._ttl:
+            return None
+        return entry
+
+    def record(self, key: str, desired: Any, data: Any) -> None:
+        """
+        Record that the resource was verified to be in its desired state.
+
+        :param key: The key identifying the resource
+        :param desired: The desired state of the resource
+        :param data: The value of the resource on the server
+        """
+        entry = {
+            "desired": fingerprint(desired),
+            "data": data,
+            "verified": time.time(),
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._updates[key] = entry
+
+    def save(self) -> None:
+        """
+        Save the recorded entries to the cache file.
+
+        Entries recorded by other processes since the file was loaded are
+        kept, so that concurrent modules don't overwrite each other.
+
+        :raise OSError: if the file could not be written
+        """
+        if not self._updates:
+            return
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = self._path.with_name(f"{self._path.name}.lock")
+        with lock_path.open("w", encoding="utf-8") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = {**self._load(), **self._updates}
+
+            # The file is only readable by us, as resources can hold secrets
+            fd, tmp_path = tempfile.mkstemp(dir=self._path.parent)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+                    json.dump(entries, tmp)
+                Path(tmp_path).replace(self._path)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+
+        self._updates = {}
+
+
+_CACHES: dict[str, FingerprintCache] = {}
+# Caches are requested from worker threads, and must only be loaded once
+_CACHES_LOCK = threading.Lock()
+
+
+def get_fingerprint_cache(path: str, ttl: int) -> FingerprintCache:
+    """
+    Get the fingerprint cache stored in the provided file.
+
+    :param path: The file in which the fingerprints are stored
+    :param ttl: The number of seconds during which a verification is trusted
+    :return: The fingerprint cache
+    """
+    with _CACHES_LOCK:
+        if path not in _CACHES:
+            _CACHES[path] = FingerprintCache(path, ttl)
+        return _CACHES[path]
+
+
+def save_fingerprint_caches() -> None:
+    """
+    Save all the fingerprint caches used during this module run.
+
+    :raise OSError: if a file could not be written
+    """
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+    for cache in caches:
+        cache.save()
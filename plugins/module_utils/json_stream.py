@@ -0,0 +1,126 @@
+"""This module provides an incremental decoder for JSON list responses."""
+
+import codecs
+import json
+from collections.abc import Callable, Iterator
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+
+
+class JSONListStream:  # pylint: disable=too-many-instance-attributes
+    """
+    Decode a JSON object incrementally, yielding the entries of one of its lists.
+
+    The body is read chunk by chunk, and the entries of the list are decoded
+    and yielded one at a time, so that only the entry being decoded needs to
+    be held in memory. The other fields of the object are decoded as a whole,
+    and are available in :attr:`fields` once the iteration is done.
+
+    :param read: A function returning up to the requested number of bytes of
+                 the body, or nothing once all of it was read
+    :param key: The key of the list to iterate over
+    :param chunk_size: The number of bytes to read at a time
+    """
+
+    def __init__(
+        self, read: Callable[[int], bytes], key: str, chunk_size: int = 65536
+    ) -> None:
+        self._read = read
+        self._key = key
+        self._chunk_size = chunk_size
+
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+        self.fields: dict[str, Any] = {}
+        self.bytes_read = 0
+
+    def _fill(self) -> None:
+        if self._eof:
+            msg = "Unexpected end of the JSON document"
+            raise ValueError(msg)
+
+        chunk = self._read(self._chunk_size)
+        self.bytes_read += len(chunk)
+        self._eof = not chunk
+        # Drop what was already decoded, so the buffer doesn't keep growing
+        self._buffer = self._buffer[self._position :] + self._utf8.decode(
+            chunk, final=self._eof
+        )
+        self._position = 0
+
+    def _next_char(self) -> str:
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in _WHITESPACE
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                char = self._buffer[self._position]
+                self._position += 1
+                return char
+            self._fill()
+
+    def _expect(self, expected: str) -> None:
+        char = self._next_char()
+        if char != expected:
+            msg = f"Expected '{expected}' in the JSON document, got '{char}'"
+            raise ValueError(msg)
+
+    def _decode_value(self) -> Any:
+        # Put back the first character of the value
+        self._next_char()
+        self._position -= 1
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(
+                    self._buffer, self._position
+                )
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # A number could continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._position = end
+                    return value
+            self._fill()
+
+    def _next_separator(self, end: str) -> bool:
+        char = self._next_char()
+        if char not in [",", end]:
+            msg = f"Expected ',' or '{end}' in the JSON document, got '{char}'"
+            raise ValueError(msg)
+        return char == ","
+
+    def _entries(self, end: str) -> Iterator[None]:
+        if self._next_char() == end:
+            return
+        self._position -= 1
+        yield
+        while self._next_separator(end):
+            yield
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterate over the entries of the list.
+
+        :return: An iterator over the decoded entries
+        :raise ValueError: if the body is not a valid JSON object
+        """
+        self._expect("{")
+        for _ in self._entries("}"):
+            key = self._decode_value()
+            self._expect(":")
+            if key == self._key:
+                self._expect("[")
+                for _ in self._entries("]"):
+                    yield self._decode_value()
+            else:
+                self.fields[key] = self._decode_value()
@@ -53,6 +53,7 @@ options:
 extends_documentation_fragment:
   - benschubert.infrastructure.authentik
   - benschubert.infrastructure.authentik.stateful
+  - benschubert.infrastructure.authentik.fingerprint
 
 author:
   - Benjamin Schubert (@benjaminschubert)
@@ -96,7 +97,7 @@ from ansible_collections.benschubert.infrastructure.plugins.module_utils.authent
 
 
 def main() -> NoReturn:  # type: ignore[misc]
-    argument_spec = get_base_arguments()
+    argument_spec = get_base_arguments(include_fingerprint=True)
     argument_spec["application"] = {
         "type": "dict",
         "required": True,
@@ -0,0 +1,652 @@
+DOCUMENTATION = """
+---
+module: authentik_application_stack
+
+short_description: Ensures an application and everything it needs exist in Authentik
+
+description:
+  - This module ensures that an application, its OAuth2 or proxy provider,
+    the groups allowed to access it and its outpost are configured in
+    Authentik, via the Authentik API, in a single invocation.
+  - The flows, certificate and scopes the provider needs are looked up, and
+    the groups and the outpost are reconciled, concurrently. The provider is
+    then reconciled, and finally the application, with the bindings
+    restricting it to the allowlisted groups, and the registration of a proxy
+    provider against the outpost, concurrently.
+  - All changes are reported in a single diff.
+  - In check mode, resources that would be created have no pk yet, so what
+    depends on them, like bindings to new groups, is not reported.
+
+options:
+  application:
+    description:
+      - The application to configure
+    type: dict
+    required: true
+    suboptions:
+      name:
+        description:
+          - The human readable name of the application, also used as the
+            name of its provider
+        type: str
+        required: true
+      slug:
+        description:
+          - The unique identifier of the application
+        type: str
+        required: true
+      group:
+        description:
+          - The group in which to show the application on the dashboard
+        type: str
+      meta_description:
+        description:
+          - The description to show on the dashboard about the application
+        type: str
+      meta_icon:
+        description:
+          - The URL of the icon to show on the dashboard
+        type: str
+      open_in_new_tab:
+        description:
+          - Whether to open the application in a new tab from the dashboard
+        type: bool
+        default: false
+  provider_oauth2:
+    description:
+      - The OAuth2 provider for the application
+      - Mutually exclusive with O(provider_proxy)
+    type: dict
+    suboptions:
+      grant_types:
+        description:
+          - The types of grants that the oauth2 application can ask for.
+        type: list
+        elements: str
+        required: true
+      redirect_uris:
+        description:
+          - The URIs that are valid redirection targets after login.
+          - "This must be a dictionary of the form {url: <url>, matching_mode: 'strict' or 'regex'}"
+        type: list
+        elements: dict
+        required: true
+      scopes:
+        description:
+          - The names of the scopes to give to the application
+        type: list
+        elements: str
+        default: []
+      sub_mode:
+        description:
+          - The mode for the OAuth sub information
+        type: str
+        default: hashed_user_id
+        choices:
+          - hashed_user_id
+          - user_id
+          - user_uuid
+          - user_username
+          - user_email
+          - user_upn
+  provider_proxy:
+    description:
+      - The proxy provider for the application, which is also registered
+        against the O(outpost)
+      - Mutually exclusive with O(provider_oauth2)
+    type: dict
+    suboptions:
+      external_host:
+        description:
+          - The URL at which the application is reachable
+        type: str
+        required: true
+      mode:
+        description:
+          - How the proxy protects the application
+        type: str
+        default: forward_single
+        choices:
+          - forward_domain
+          - forward_single
+          - proxy
+  authorization_flow:
+    description:
+      - The slug of the flow used to authorize connecting to the application
+    type: str
+    default: default-provider-authorization-explicit-consent
+  invalidation_flow:
+    description:
+      - The slug of the flow used to invalidate a session
+    type: str
+    default: default-provider-invalidation-flow
+  signing_key:
+    description:
+      - The name of the certificate used to sign the OAuth2 tokens
+    type: str
+    default: authentik Self-signed Certificate
+  outpost:
+    description:
+      - The outpost serving the proxy provider
+    type: dict
+    default: {}
+    suboptions:
+      name:
+        description:
+          - The name of the outpost
+        type: str
+        default: authentik Embedded Outpost
+      config:
+        description:
+          - The configuration of the outpost. It is left untouched if not
+            provided
+        type: dict
+        suboptions:
+          authentik_host:
+            description:
+              - The URL at which the outpost can reach Authentik
+            type: str
+            required: true
+  allowlisted_groups:
+    description:
+      - The names of the groups allowed to access the application, which are
+        created if needed
+      - The bindings of the application to other groups are removed, its
+        bindings to users and policies are kept
+      - When empty, the bindings of the application are left untouched
+    type: list
+    elements: str
+    default: []
+
+extends_documentation_fragment:
+  - benschubert.infrastructure.authentik
+  - benschubert.infrastructure.authentik.concurrent
+  - benschubert.infrastructure.authentik.fingerprint
+
+author:
+  - Benjamin Schubert (@benjaminschubert)
+"""
+
+EXAMPLES = """
+- name: Protect grafana behind Authentik, for admins only
+  benschubert.infrastructure.authentik_application_stack:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    application:
+      name: Grafana
+      slug: grafana
+      group: Monitoring
+      open_in_new_tab: true
+    provider_oauth2:
+      grant_types:
+        - authorization_code
+        - refresh_token
+      redirect_uris:
+        - url: https://grafana.test/login/generic_oauth
+          matching_mode: strict
+      scopes:
+        - email
+        - openid
+        - profile
+    allowlisted_groups:
+      - Grafana Admins
+
+- name: Protect a static site with the embedded outpost
+  benschubert.infrastructure.authentik_application_stack:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    application:
+      name: Docs
+      slug: docs
+    provider_proxy:
+      external_host: https://docs.test
+    outpost:
+      config:
+        authentik_host: https://authentik.test/
+"""
+
+RETURN = """
+data:
+  description:
+    - The application
+  returned: always
+  type: dict
+  sample:
+    name: Grafana
+    pk: <pk>
+    provider: <provider-pk>
+    slug: grafana
+provider:
+  description:
+    - The provider of the application
+  returned: always
+  type: dict
+results:
+  description:
+    - The result for each of the resources that were reconciled, in the
+      order they were reconciled
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - kind: group
+      changed: true
+      msg: entry updated
+      data:
+        name: Grafana Admins
+        pk: <pk>
+      diff:
+        before: null
+        after:
+          name: Grafana Admins
+          pk: <pk>
+    - kind: provider_oauth2
+      changed: false
+      msg: entry is up to date
+      data: <...>
+    - kind: application
+      changed: false
+      msg: entry is up to date
+      data: <...>
+    - kind: policy_bindings
+      changed: true
+      bindings: <...>
+      created: <...>
+      updated: []
+      deleted: []
+      diff: <...>
+"""
+
+
+import functools
+from typing import Any, NoReturn, cast
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
+    Authentik,
+    get_base_arguments,
+    project,
+    project_result,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik_kinds import (
+    NAMED_KINDS,
+    RESOURCE_KINDS,
+    reconcile_kind,
+    register_outpost_providers,
+    sync_policy_bindings,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    fail,
+    run_concurrently,
+)
+
+# The bindings restricting the application to its allowlisted groups
+_GROUP_BINDING = {
+    "enabled": True,
+    "failure_result": False,
+    "negate": False,
+    "order": 0,
+    "policy": None,
+    "user": None,
+}
+
+
+def _lookup(module: AnsibleModule, kind: str, name: str) -> dict[str, Any]:
+    api_slug, param = NAMED_KINDS[kind]
+    return {
+        "changed": False,
+        "data": Authentik(module, api_slug).get_one({param: name}),
+    }
+
+
+def _reconcile(
+    module: AnsibleModule, kind: str, desired: dict[str, Any]
+) -> dict[str, Any]:
+    return cast(
+        "dict[str, Any]",
+        reconcile_kind(
+            module,
+            Authentik(module, RESOURCE_KINDS[kind].api_slug),
+            RESOURCE_KINDS[kind],
+            desired,
+            "present",
+        ),
+    )
+
+
+def _prepare(module: AnsibleModule) -> dict[tuple[str, str], dict[str, Any]]:
+    """
+    Resolve the dependencies of the provider, concurrently.
+
+    The flows, certificate and scopes are looked up, while the groups and the
+    outpost are reconciled, since nothing else is needed for them.
+
+    :param module: The ansible module
+    :return: The result for each kind and name of dependency, where looked up
+             resources have a ``data`` of None if they do not exist
+    """
+    params = module.params
+    lookups = [
+        ("flow", params["authorization_flow"]),
+        ("flow", params["invalidation_flow"]),
+    ]
+    if params["provider_oauth2"] is not None:
+        lookups.append(("certificate", params["signing_key"]))
+        lookups.extend(
+            ("scope", scope) for scope in params["provider_oauth2"]["scopes"]
+        )
+
+    outpost = params["outpost"]
+    tasks: dict[tuple[str, str], functools.partial[dict[str, Any]]] = {
+        lookup: functools.partial(_lookup, module, *lookup)
+        for lookup in lookups
+    }
+    for name in params["allowlisted_groups"]:
+        tasks["group", name] = functools.partial(
+            _reconcile, module, "group", {"name": name}
+        )
+    if outpost["config"] is not None:
+        tasks["outpost", outpost["name"]] = functools.partial(
+            _reconcile, module, "outpost", outpost
+        )
+    elif params["provider_proxy"] is not None:
+        tasks["outpost", outpost["name"]] = functools.partial(
+            _lookup, module, "outpost", outpost["name"]
+        )
+
+    results = run_concurrently(
+        module, lambda task: task(), list(tasks.values())
+    )
+    resolved = dict(zip(tasks, results, strict=True))
+
+    missing = [
+        f"{kind} '{name}'"
+        for (kind, name), result in resolved.items()
+        if result["data"] is None
+    ]
+    if missing:
+        fail(
+            module,
+            f"Could not find the dependencies: {', '.join(missing)}",
+            missing=missing,
+        )
+    return resolved
+
+
+def _provider(
+    module: AnsibleModule, resolved: dict[tuple[str, str], dict[str, Any]]
+) -> tuple[str, dict[str, Any]]:
+    """
+    Build the desired provider, from its resolved dependencies.
+
+    :param module: The ansible module
+    :param resolved: The dependencies, as returned by :func:`_prepare`
+    :return: The kind of the provider and its desired value
+    """
+    params = module.params
+    provider = {
+        "name": params["application"]["name"],
+        "authorization_flow": resolved["flow", params["authorization_flow"]][
+            "data"
+        ]["pk"],
+        "invalidation_flow": resolved["flow", params["invalidation_flow"]][
+            "data"
+        ]["pk"],
+    }
+
+    if params["provider_proxy"] is not None:
+        return "provider_proxy", provider | params["provider_proxy"]
+
+    oauth2 = params["provider_oauth2"]
+    return "provider_oauth2", provider | {
+        "grant_types": oauth2["grant_types"],
+        "property_mappings": [
+            resolved["scope", scope]["data"]["pk"]
+            for scope in oauth2["scopes"]
+        ],
+        "redirect_uris": oauth2["redirect_uris"],
+        "signing_key": resolved["certificate", params["signing_key"]]["data"][
+            "pk"
+        ],
+        "sub_mode": oauth2["sub_mode"],
+    }
+
+
+def _application(
+    module: AnsibleModule,
+    provider_pk: int | None,
+    group_pks: list[str] | None,
+) -> list[tuple[str, dict[str, Any]]]:
+    """
+    Reconcile the application, and restrict it to the allowlisted groups.
+
+    Only the group bindings of the application are managed, other bindings
+    are kept.
+
+    :param module: The ansible module
+    :param provider_pk: The pk of the provider of the application
+    :param group_pks: The pks of the allowlisted groups, or None to leave
+                      the bindings of the application untouched
+    :return: The kind and result of each reconciled resource
+    """
+    application = _reconcile(
+        module,
+        "application",
+        module.params["application"] | {"provider": provider_pk},
+    )
+    target = application["data"].get("pk")
+    if target is None or group_pks is None:
+        return [("application", application)]
+
+    bindings = sync_policy_bindings(
+        module,
+        Authentik(module, RESOURCE_KINDS["policy_binding"].api_slug),
+        target,
+        [{**_GROUP_BINDING, "group": pk} for pk in group_pks],
+        exclusive=["group"],
+    )
+    return [("application", application), ("policy_bindings", bindings)]
+
+
+def _outpost(
+    module: AnsibleModule, outpost: dict[str, Any], provider_pk: int
+) -> list[tuple[str, dict[str, Any]]]:
+    """
+    Register the proxy provider against the outpost.
+
+    The outpost is read again first, as the one provided can come from the
+    fingerprint cache, and its providers be outdated. Merging into those
+    would drop the providers registered since.
+
+    :param module: The ansible module
+    :param outpost: The outpost
+    :param provider_pk: The pk of the provider
+    :return: The kind and result of the registration
+    """
+    authentik = Authentik(module, RESOURCE_KINDS["outpost"].api_slug)
+    current = authentik.get(outpost["pk"])
+    if current is None:
+        fail(module, f"The outpost {outpost['name']} does not exist")
+
+    return [
+        (
+            "outpost_providers",
+            register_outpost_providers(
+                module, authentik, current, [provider_pk], "present"
+            ),
+        )
+    ]
+
+
+def main() -> NoReturn:  # type: ignore[misc]
+    argument_spec = get_base_arguments(
+        include_state=False,
+        include_concurrency=True,
+        include_fingerprint=True,
+    )
+    argument_spec.update(
+        {
+            "application": {
+                "type": "dict",
+                "required": True,
+                "options": {
+                    "name": {"type": "str", "required": True},
+                    "slug": {"type": "str", "required": True},
+                    "group": {"type": "str"},
+                    "meta_description": {"type": "str"},
+                    "meta_icon": {"type": "str"},
+                    "open_in_new_tab": {"type": "bool", "default": False},
+                },
+            },
+            "provider_oauth2": {
+                "type": "dict",
+                "options": {
+                    "grant_types": {
+                        "type": "list",
+                        "elements": "str",
+                        "required": True,
+                    },
+                    "redirect_uris": {
+                        "type": "list",
+                        "elements": "dict",
+                        "required": True,
+                    },
+                    "scopes": {
+                        "type": "list",
+                        "elements": "str",
+                        "default": [],
+                    },
+                    "sub_mode": {
+                        "type": "str",
+                        "default": "hashed_user_id",
+                        "choices": [
+                            "hashed_user_id",
+                            "user_id",
+                            "user_uuid",
+                            "user_username",
+                            "user_email",
+                            "user_upn",
+                        ],
+                    },
+                },
+            },
+            "provider_proxy": {
+                "type": "dict",
+                "options": {
+                    "external_host": {"type": "str", "required": True},
+                    "mode": {
+                        "type": "str",
+                        "default": "forward_single",
+                        "choices": [
+                            "forward_domain",
+                            "forward_single",
+                            "proxy",
+                        ],
+                    },
+                },
+            },
+            "authorization_flow": {
+                "type": "str",
+                "default": "default-provider-authorization-explicit-consent",
+            },
+            "invalidation_flow": {
+                "type": "str",
+                "default": "default-provider-invalidation-flow",
+            },
+            "signing_key": {
+                "type": "str",
+                "default": "authentik Self-signed Certificate",
+            },
+            "outpost": {
+                "type": "dict",
+                "default": {},
+                "options": {
+                    "name": {
+                        "type": "str",
+                        "default": "authentik Embedded Outpost",
+                    },
+                    "config": {
+                        "type": "dict",
+                        "options": {
+                            "authentik_host": {
+                                "type": "str",
+                                "required": True,
+                            },
+                        },
+                    },
+                },
+            },
+            "allowlisted_groups": {
+                "type": "list",
+                "elements": "str",
+                "default": [],
+            },
+        }
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        mutually_exclusive=[("provider_oauth2", "provider_proxy")],
+        required_one_of=[("provider_oauth2", "provider_proxy")],
+        supports_check_mode=True,
+    )
+
+    resolved = _prepare(module)
+    results = [
+        (kind, result)
+        for (kind, _), result in resolved.items()
+        if kind == "group"
+        or (kind == "outpost" and module.params["outpost"]["config"])
+    ]
+
+    provider_kind, desired_provider = _provider(module, resolved)
+    provider = _reconcile(module, provider_kind, desired_provider)
+    results.append((provider_kind, provider))
+    provider_pk = provider["data"].get("pk")
+
+    # Resources that would be created in check mode have no pk
+    group_pks = [
+        resolved["group", name]["data"]["pk"]
+        for name in module.params["allowlisted_groups"]
+        if "pk" in resolved["group", name]["data"]
+    ]
+    tasks: list[functools.partial[list[tuple[str, dict[str, Any]]]]] = [
+        functools.partial(
+            _application,
+            module,
+            provider_pk,
+            group_pks if module.params["allowlisted_groups"] else None,
+        )
+    ]
+    outpost = resolved.get(("outpost", module.params["outpost"]["name"]))
+    if (
+        module.params["provider_proxy"] is not None
+        and outpost is not None
+        and "pk" in outpost["data"]
+        and provider_pk is not None
+    ):
+        tasks.append(
+            functools.partial(_outpost, module, outpost["data"], provider_pk)
+        )
+
+    for task_results in run_concurrently(module, lambda task: task(), tasks):
+        results.extend(task_results)
+
+    projected = [
+        {"kind": kind, **project_result(module, result)}
+        for kind, result in results
+    ]
+    application = dict(results)["application"]
+
+    # All clients share the same connections, so any can report on them
+    Authentik(module, "/api/v3/").exit_json(
+        changed=any(result["changed"] for result in projected),
+        diff=[result["diff"] for result in projected if "diff" in result],
+        results=projected,
+        data=application["data"],
+        provider=project(provider["data"], module.params["return_fields"]),
+    )
+
+
+if __name__ == "__main__":
+    main()
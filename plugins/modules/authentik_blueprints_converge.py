@@ -0,0 +1,160 @@
+DOCUMENTATION = """
+---
+module: authentik_blueprints_converge
+
+short_description: Ensures all Authentik blueprints are successfully applied
+
+description:
+  - This module ensures that all the blueprints known to Authentik were
+    applied successfully, applying the ones that were not.
+  - The statuses of all blueprints are fetched first, and the pending
+    blueprints are then applied concurrently.
+  - Blueprints can depend on each other, so a blueprint failing to apply is
+    retried, with an exponential backoff, until it succeeds or
+    O(convergence_timeout) is reached.
+  - See https://docs.goauthentik.io/docs/customize/blueprints/
+
+options:
+  convergence_timeout:
+    description:
+      - The maximum number of seconds to keep retrying a blueprint that fails
+        to apply
+    type: int
+    default: 300
+  poll_interval:
+    description:
+      - The number of seconds to wait before retrying a blueprint that failed
+        to apply for the first time
+      - This doubles after every failure, up to 10 seconds
+    type: float
+    default: 0.5
+
+extends_documentation_fragment:
+  - benschubert.infrastructure.authentik
+  - benschubert.infrastructure.authentik.concurrent
+
+notes:
+  - Applying a blueprint can take a while, you might need to bump O(timeout)
+
+author:
+  - Benjamin Schubert (@benjaminschubert)
+"""
+
+EXAMPLES = """
+- name: Ensure all blueprints have converged
+  benschubert.infrastructure.authentik_blueprints_converge:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    timeout: 60
+"""
+
+RETURN = """
+blueprints:
+  description:
+    - The blueprints that were pending and needed to be applied
+    - In check mode, they are reported but not applied, and have no
+      C(attempts) or C(duration)
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - name: My blueprint
+      pk: <pk>
+      status: successful
+      attempts: 2
+      duration: 3.527
+"""
+
+
+import time
+from typing import Any, NoReturn
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
+    Authentik,
+    get_base_arguments,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    fail,
+    run_concurrently,
+)
+
+_MAX_POLL_INTERVAL = 10
+
+
+def _apply(
+    module: AnsibleModule, authentik: Authentik, blueprint: dict[str, Any]
+) -> dict[str, Any]:
+    start = time.monotonic()
+    deadline = start + module.params["convergence_timeout"]
+
+    attempts = 0
+    while True:
+        attempts += 1
+        result = authentik.request(f"{blueprint['pk']}/apply/", method="POST")
+        status = result["status"] if result is not None else "unknown"
+        if status == "successful":
+            break
+
+        delay = min(
+            module.params["poll_interval"] * 2 ** (attempts - 1),
+            _MAX_POLL_INTERVAL,
+        )
+        if time.monotonic() + delay > deadline:
+            fail(
+                module,
+                f"Blueprint '{blueprint['name']}' did not apply successfully"
+                f" after {attempts} attempts, last status was '{status}'",
+                blueprint=result,
+            )
+        time.sleep(delay)
+
+    return {
+        "name": blueprint["name"],
+        "pk": blueprint["pk"],
+        "status": status,
+        "attempts": attempts,
+        "duration": round(time.monotonic() - start, 3),
+    }
+
+
+def main() -> NoReturn:  # type: ignore[misc]
+    argument_spec = get_base_arguments(
+        include_state=False, include_concurrency=True
+    )
+    argument_spec["convergence_timeout"] = {"type": "int", "default": 300}
+    argument_spec["poll_interval"] = {"type": "float", "default": 0.5}
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    authentik = Authentik(module, "/api/v3/managed/blueprints/")
+    pending = [
+        blueprint
+        for blueprint in authentik.iterate()
+        if blueprint["status"] != "successful"
+    ]
+
+    if module.check_mode:
+        results = [
+            {
+                "name": blueprint["name"],
+                "pk": blueprint["pk"],
+                "status": blueprint["status"],
+            }
+            for blueprint in pending
+        ]
+    else:
+        results = run_concurrently(
+            module,
+            lambda blueprint: _apply(module, authentik, blueprint),
+            pending,
+        )
+
+    authentik.exit_json(changed=bool(pending), blueprints=results)
+
+
+if __name__ == "__main__":
+    main()
@@ -73,7 +73,7 @@ def main() -> NoReturn:  # type: ignore[misc]
 
     authentik = Authentik(module, "/api/v3/crypto/certificatekeypairs/")
     result = authentik.get_one({"name": module.params["name"]})
-    module.exit_json(changed=False, data=result)
+    authentik.exit_json(changed=False, data=result)
 
 
 if __name__ == "__main__":
@@ -68,7 +68,7 @@ def main() -> NoReturn:  # type: ignore[misc]
 
     authentik = Authentik(module, "/api/v3/flows/instances/")
     result = authentik.get_one({"slug": module.params["slug"]})
-    module.exit_json(changed=False, data=result)
+    authentik.exit_json(changed=False, data=result)
 
 
 if __name__ == "__main__":
@@ -26,6 +26,7 @@ options:
 extends_documentation_fragment:
   - benschubert.infrastructure.authentik
   - benschubert.infrastructure.authentik.stateful
+  - benschubert.infrastructure.authentik.fingerprint
 
 author:
   - Benjamin Schubert (@benjaminschubert)
@@ -65,7 +66,7 @@ from ansible_collections.benschubert.infrastructure.plugins.module_utils.authent
 
 
 def main() -> NoReturn:  # type: ignore[misc]
-    argument_spec = get_base_arguments()
+    argument_spec = get_base_arguments(include_fingerprint=True)
     argument_spec["group"] = {
         "type": "dict",
         "required": True,
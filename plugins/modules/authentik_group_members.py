@@ -0,0 +1,143 @@
+DOCUMENTATION = """
+---
+module: authentik_group_members
+
+short_description: Ensures a group in Authentik has exactly the provided members
+
+description:
+  - This module ensures that the provided users, and only them, are members of
+    an Authentik group, via the Authentik API.
+  - The current members of the group are read from the primary keys listed
+    on the group, without fetching the users themselves, and the users to add
+    and remove are then applied concurrently, through the dedicated endpoints
+    of the group.
+  - This stays fast with groups of many thousands of members, use
+    M(benschubert.infrastructure.authentik_user_group) to add or remove
+    users without touching the other members.
+  - See https://docs.goauthentik.io/docs/users-sources/groups/
+
+options:
+  group_pk:
+    description:
+      - The pk of the group whose members to manage
+    type: str
+    required: true
+  users:
+    description:
+      - The pks of the users that should be members of the group
+    type: list
+    elements: int
+    required: true
+
+extends_documentation_fragment:
+  - benschubert.infrastructure.authentik
+  - benschubert.infrastructure.authentik.concurrent
+
+author:
+  - Benjamin Schubert (@benjaminschubert)
+"""
+
+EXAMPLES = """
+- name: Ensure only the current employees are in the group '5'
+  benschubert.infrastructure.authentik_group_members:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    group_pk: 5
+    users: "{{ employees | map(attribute='pk') }}"
+    max_concurrency: 16
+"""
+
+RETURN = """
+added:
+  description:
+    - The pks of the users that were added to the group
+  returned: always
+  type: list
+  elements: int
+  sample:
+    - <user1_pk>
+removed:
+  description:
+    - The pks of the users that were removed from the group
+  returned: always
+  type: list
+  elements: int
+  sample:
+    - <user2_pk>
+"""
+
+
+from typing import NoReturn
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
+    Authentik,
+    get_base_arguments,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    fail,
+    run_concurrently,
+)
+
+
+def main() -> NoReturn:  # type: ignore[misc]
+    argument_spec = get_base_arguments(
+        include_state=False, include_concurrency=True
+    )
+    argument_spec["group_pk"] = {"type": "str", "required": True}
+    argument_spec["users"] = {
+        "type": "list",
+        "elements": "int",
+        "required": True,
+    }
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    group_pk = module.params["group_pk"]
+    groups = Authentik(module, "/api/v3/core/groups/")
+
+    # The group lists the pks of its members, users can be large objects
+    group = groups.request(
+        f"{group_pk}/", queryparams={"include_users": "false"}
+    )
+    if group is None:
+        fail(module, f"The group {group_pk} does not exist")
+
+    current = set(group["users"])
+    desired = set(module.params["users"])
+    added = sorted(desired - current)
+    removed = sorted(current - desired)
+
+    if not added and not removed:
+        groups.exit_json(changed=False, added=added, removed=removed)
+
+    if not module.check_mode:
+        # A missing user is reported as a 404
+        run_concurrently(
+            module,
+            lambda change: groups.request(
+                f"{group_pk}/{change[0]}/",
+                data={"pk": change[1]},
+                method="POST",
+                allow_missing=False,
+            ),
+            [("add_user", user) for user in added]
+            + [("remove_user", user) for user in removed],
+        )
+
+    groups.exit_json(
+        changed=True,
+        diff={
+            "before": {"users": sorted(current)},
+            "after": {"users": sorted(desired)},
+        },
+        added=added,
+        removed=removed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,14 +7,27 @@ short_description: Allows connecting Authentik providers to outposts
 description:
   - This module allows the administration of Authentik outposts connections with
     providers via the Authentik API.
+  - The API only allows replacing the whole list of providers of an outpost.
+    Runs changing the providers of the same outpost concurrently can thus
+    overwrite each other's changes, while all reporting success. Pass all the
+    providers to a single task with O(provider_pks) instead, or make sure such
+    tasks do not run at the same time, for example by setting C(throttle) to
+    1 on them.
   - See https://docs.goauthentik.io/docs/add-secure-apps/outposts/
 
 options:
   provider_pk:
     description:
       - The private key of the provider to configure
-    required: true
+      - Mutually exclusive with O(provider_pks)
     type: int
+  provider_pks:
+    description:
+      - The private keys of the providers to configure
+      - They are all added or removed in a single update
+      - Mutually exclusive with O(provider_pk)
+    type: list
+    elements: int
   outpost_name:
     description:
       - The name of the outpost that should handle the given provider
@@ -36,6 +49,13 @@ EXAMPLES = """
     authentik_url: https://authentik.test/
     outpost_name: authentik Embedded Outpost
     provider_pk: <pk>
+
+- name: Configure the proxy providers of all applications to use the builtin outpost
+  benschubert.infrastructure.authentik_outpost_provider:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    outpost_name: authentik Embedded Outpost
+    provider_pks: "{{ applications | map(attribute='provider_pk') }}"
 """
 
 RETURN = """
@@ -50,12 +70,10 @@ data:
     pk: <pk>
     providers:
       - 1
-    providers_obj: <...>
     type: proxy
 """
 
 
-import copy
 from typing import NoReturn
 
 from ansible.module_utils.basic import AnsibleModule
@@ -63,6 +81,12 @@ from ansible_collections.benschubert.infrastructure.plugins.module_utils.authent
     Authentik,
     get_base_arguments,
 )
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik_kinds import (
+    register_outpost_providers,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    fail,
+)
 
 
 def main() -> NoReturn:  # type: ignore[misc]
@@ -70,44 +94,36 @@ def main() -> NoReturn:  # type: ignore[misc]
     argument_spec.update(
         {
             "outpost_name": {"type": "str", "required": True},
-            "provider_pk": {"type": "int", "required": True},
+            "provider_pk": {"type": "int"},
+            "provider_pks": {"type": "list", "elements": "int"},
         },
     )
 
     module = AnsibleModule(
         argument_spec=argument_spec,
+        mutually_exclusive=[("provider_pk", "provider_pks")],
+        required_one_of=[("provider_pk", "provider_pks")],
         supports_check_mode=True,
     )
 
-    outpost_name = module.params["outpost_name"]
-    provider_pk = module.params["provider_pk"]
+    if module.params["provider_pks"] is None:
+        module.params["provider_pks"] = [module.params["provider_pk"]]
 
+    outpost_name = module.params["outpost_name"]
     authentik = Authentik(module, "/api/v3/outposts/instances/")
 
     outpost = authentik.get_one({"name__iexact": outpost_name})
-    final_state = copy.deepcopy(outpost)
-
-    if module.params["state"] == "absent":
-        if provider_pk not in outpost["providers"]:
-            module.exit_json(changed=False, data=outpost)
-
-        final_state["providers"].pop(provider_pk)
-        msg = "provider removed"
-    else:
-        if provider_pk in outpost["providers"]:
-            module.exit_json(changed=False, data=outpost)
-
-        final_state["providers"].append(provider_pk)
-        msg = "provider added"
-
-    if not module.check_mode:
-        final_state = authentik.update(outpost["pk"], final_state)
-
-    module.exit_json(
-        changed=True,
-        diff={"before": outpost, "after": final_state},
-        msg=msg,
-        data=final_state,
+    if outpost is None:
+        fail(module, f"The outpost {outpost_name} does not exist")
+
+    authentik.exit_json(
+        **register_outpost_providers(
+            module,
+            authentik,
+            outpost,
+            module.params["provider_pks"],
+            module.params["state"],
+        )
     )
 
 
@@ -62,6 +62,7 @@ options:
 extends_documentation_fragment:
   - benschubert.infrastructure.authentik
   - benschubert.infrastructure.authentik.stateful
+  - benschubert.infrastructure.authentik.fingerprint
 
 author:
   - Benjamin Schubert (@benjaminschubert)
@@ -106,10 +107,13 @@ from ansible_collections.benschubert.infrastructure.plugins.module_utils.authent
     execute,
     get_base_arguments,
 )
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik_kinds import (
+    find_policy_binding,
+)
 
 
 def main() -> NoReturn:  # type: ignore[misc]
-    argument_spec = get_base_arguments()
+    argument_spec = get_base_arguments(include_fingerprint=True)
     argument_spec["binding"] = {
         "type": "dict",
         "required": True,
@@ -133,25 +137,10 @@ def main() -> NoReturn:  # type: ignore[misc]
 
     binding = module.params["binding"]
 
-    # The Authentik API doesn't allow search by group or user
     def find(authentik: Authentik) -> dict[str, Any] | None:
-        if binding["policy"] is not None:
-            return cast(
-                "dict[str, Any] | None",
-                authentik.get_one(
-                    {"target": binding["target"], "policy": binding["policy"]}
-                ),
-            )
-
-        resp = authentik.request(queryparams={"target": binding["target"]})
-        assert resp is not None
-
-        for result in resp["results"]:
-            for key in ["group", "user"]:
-                if binding[key] is not None and binding[key] == result[key]:
-                    return cast("dict[str, Any] | None", result)
-
-        return None
+        return cast(
+            "dict[str, Any] | None", find_policy_binding(authentik, binding)
+        )
 
     execute(
         module,
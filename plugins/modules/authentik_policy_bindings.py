@@ -0,0 +1,221 @@
+DOCUMENTATION = """
+module: authentik_policy_bindings
+
+short_description: Allow administration of all the policy bindings of a target
+
+description:
+  - This module ensures that the policy bindings of a flow or application in
+    Authentik are exactly the ones provided, via the Authentik API
+  - The existing bindings of the target are fetched once, and the bindings to
+    create, update and delete are then applied concurrently
+  - Bindings are identified by the policy, group or user they bind, as with
+    M(benschubert.infrastructure.authentik_policy_binding)
+  - See https://docs.goauthentik.io/docs/customize/policies/working_with_policies/
+
+options:
+  target:
+    description:
+      - The pk of the flow or application whose bindings to manage
+    type: str
+    required: true
+  bindings:
+    description:
+      - The bindings the target should have
+      - At least one of C(group), C(policy) or C(user) needs to be provided
+        for each binding, and each can only be bound once
+    type: list
+    elements: dict
+    required: true
+    suboptions:
+      enabled:
+        description:
+          - Whether the policy is enabled or not
+        type: bool
+        default: true
+      failure_result:
+        description:
+          - The result if the policy execution fails
+        type: bool
+        default: false
+      group:
+        description:
+          - The pk of the group to allow/deny access to the target
+        type: str
+        default: null
+      negate:
+        description:
+          - Negates the outcome of the policy
+        type: bool
+        default: false
+      order:
+        description:
+          - The place in the list of policies bindings where this needs to be
+            evaluated
+        type: int
+        required: true
+      policy:
+        description:
+          - The policy to bind against the target
+        type: str
+        default: null
+      user:
+        description:
+          - The pk of the user to allow/deny access to the target
+        type: str
+        default: null
+  exclusive:
+    description:
+      - Whether to delete the bindings of the target that are not provided
+      - Only the bindings binding one of O(exclusive_kinds) are deleted
+    type: bool
+    default: true
+  exclusive_kinds:
+    description:
+      - What bindings that are not provided to delete, when O(exclusive) is
+        set
+      - Set this to only C(group) to manage the groups allowed to access the
+        target, while keeping the user and policy bindings managed elsewhere
+    type: list
+    elements: str
+    choices:
+      - group
+      - policy
+      - user
+    default:
+      - group
+      - policy
+      - user
+
+extends_documentation_fragment:
+  - benschubert.infrastructure.authentik
+  - benschubert.infrastructure.authentik.concurrent
+
+author:
+  - Benjamin Schubert (@benjaminschubert)
+"""
+
+EXAMPLES = """
+- name: Restrict access to app {{ app }} to the admins and editors
+  benschubert.infrastructure.authentik_policy_bindings:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test
+    target: "{{ app.pk }}"
+    bindings:
+      - group: "{{ admins.pk }}"
+        order: 0
+      - group: "{{ editors.pk }}"
+        order: 0
+
+- name: Allow the admins on app {{ app }}, keeping user and policy bindings
+  benschubert.infrastructure.authentik_policy_bindings:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test
+    target: "{{ app.pk }}"
+    bindings:
+      - group: "{{ admins.pk }}"
+        order: 0
+    exclusive_kinds:
+      - group
+"""
+
+RETURN = """
+bindings:
+  description:
+    - The bindings of the target, in the order they were provided
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - enabled: true
+      failure_result: false
+      group: <group-pk>
+      negate: false
+      order: 0
+      pk: <pk>
+      policy: null
+      target: <target-pk>
+      user: null
+created:
+  description:
+    - The bindings that were created
+  returned: always
+  type: list
+  elements: dict
+updated:
+  description:
+    - The bindings that were updated, with their new values
+  returned: always
+  type: list
+  elements: dict
+deleted:
+  description:
+    - The bindings that were deleted
+  returned: always
+  type: list
+  elements: dict
+"""
+
+
+from typing import NoReturn
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
+    Authentik,
+    get_base_arguments,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik_kinds import (
+    sync_policy_bindings,
+)
+
+
+def main() -> NoReturn:  # type: ignore[misc]
+    argument_spec = get_base_arguments(
+        include_state=False, include_concurrency=True
+    )
+    argument_spec["target"] = {"type": "str", "required": True}
+    argument_spec["bindings"] = {
+        "type": "list",
+        "elements": "dict",
+        "required": True,
+        "options": {
+            "enabled": {"type": "bool", "default": True},
+            "failure_result": {"type": "bool", "default": False},
+            "group": {"type": "str"},
+            "negate": {"type": "bool", "default": False},
+            "order": {"type": "int", "required": True},
+            "policy": {"type": "str"},
+            "user": {"type": "str"},
+        },
+        "required_one_of": [("group", "policy", "user")],
+    }
+    argument_spec["exclusive"] = {"type": "bool", "default": True}
+    argument_spec["exclusive_kinds"] = {
+        "type": "list",
+        "elements": "str",
+        "choices": ["group", "policy", "user"],
+        "default": ["group", "policy", "user"],
+    }
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    authentik = Authentik(module, "/api/v3/policies/bindings/")
+    authentik.exit_json(
+        **sync_policy_bindings(
+            module,
+            authentik,
+            module.params["target"],
+            module.params["bindings"],
+            exclusive=(
+                module.params["exclusive_kinds"]
+                if module.params["exclusive"]
+                else []
+            ),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,7 @@ options:
 extends_documentation_fragment:
   - benschubert.infrastructure.authentik
   - benschubert.infrastructure.authentik.stateful
+  - benschubert.infrastructure.authentik.fingerprint
 
 author:
   - Benjamin Schubert (@benjaminschubert)
@@ -80,7 +81,7 @@ from ansible_collections.benschubert.infrastructure.plugins.module_utils.authent
 
 
 def main() -> NoReturn:  # type: ignore[misc]
-    argument_spec = get_base_arguments()
+    argument_spec = get_base_arguments(include_fingerprint=True)
     argument_spec["scope"] = {
         "type": "dict",
         "required": True,
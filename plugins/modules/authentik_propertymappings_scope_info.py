@@ -85,7 +85,7 @@ def main() -> NoReturn:  # type: ignore[misc]
 
     authentik = Authentik(module, "/api/v3/propertymappings/provider/scope/")
     result = authentik.get_one({"scope_name": module.params["scope_name"]})
-    module.exit_json(changed=False, data=result)
+    authentik.exit_json(changed=False, data=result)
 
 
 if __name__ == "__main__":
@@ -76,7 +76,7 @@ def main() -> NoReturn:  # type: ignore[misc]
         module, f"/api/v3/providers/{module.params['type']}/"
     )
     result = authentik.get_one({"name": module.params["name"]})
-    module.exit_json(changed=False, data=result)
+    authentik.exit_json(changed=False, data=result)
 
 
 if __name__ == "__main__":
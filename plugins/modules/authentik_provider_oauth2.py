@@ -76,6 +76,7 @@ options:
 extends_documentation_fragment:
   - benschubert.infrastructure.authentik
   - benschubert.infrastructure.authentik.stateful
+  - benschubert.infrastructure.authentik.fingerprint
 
 author:
   - Benjamin Schubert (@benjaminschubert)
@@ -115,25 +116,20 @@ data:
 """
 
 
-from typing import Any, NoReturn
+from typing import NoReturn
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
     execute,
     get_base_arguments,
 )
-
-
-def _compare(existing: dict[str, Any], final: dict[str, Any]) -> bool:
-    if existing is not None:
-        existing["property_mappings"] = sorted(existing["property_mappings"])
-    if final is not None:
-        final["property_mappings"] = sorted(final["property_mappings"])
-    return existing == final
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik_kinds import (
+    compare_provider_oauth2,
+)
 
 
 def main() -> NoReturn:  # type: ignore[misc]
-    argument_spec = get_base_arguments()
+    argument_spec = get_base_arguments(include_fingerprint=True)
     argument_spec["provider"] = {
         "type": "dict",
         "required": True,
@@ -187,7 +183,7 @@ def main() -> NoReturn:  # type: ignore[misc]
         {"name": name},
         provider,
         state=module.params["state"],
-        compare=_compare,
+        compare=compare_provider_oauth2,
     )
 
 
@@ -0,0 +1,169 @@
+DOCUMENTATION = """
+---
+module: authentik_resolve
+
+short_description: Resolves the primary keys of multiple Authentik resources
+
+description:
+  - This module retrieves the primary keys of Authentik resources of various
+    kinds from their names, in a single invocation.
+  - All the resources are searched for concurrently, which is much faster
+    than looping over the dedicated info modules, like
+    M(benschubert.infrastructure.authentik_flow_info).
+
+options:
+  certificates:
+    description:
+      - The names of the certificate-key pairs to resolve
+    type: list
+    elements: str
+    default: []
+  flows:
+    description:
+      - The slugs of the flows to resolve
+    type: list
+    elements: str
+    default: []
+  groups:
+    description:
+      - The names of the groups to resolve
+    type: list
+    elements: str
+    default: []
+  scopes:
+    description:
+      - The scope names of the scope property mappings to resolve
+    type: list
+    elements: str
+    default: []
+  users:
+    description:
+      - The usernames of the users to resolve
+    type: list
+    elements: str
+    default: []
+
+extends_documentation_fragment:
+  - benschubert.infrastructure.authentik
+  - benschubert.infrastructure.authentik.concurrent
+
+author:
+  - Benjamin Schubert (@benjaminschubert)
+"""
+
+EXAMPLES = """
+- name: Resolve the resources needed by an OAuth2 provider
+  benschubert.infrastructure.authentik_resolve:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    certificates:
+      - authentik Self-signed Certificate
+    flows:
+      - default-provider-authorization-explicit-consent
+      - default-provider-invalidation-flow
+    scopes:
+      - openid
+      - profile
+  register: _resolved
+  # The flows are created by blueprints, which might not be applied yet
+  until: not _resolved.missing
+  retries: 5
+  delay: 5
+"""
+
+RETURN = """
+pks:
+  description:
+    - The primary keys of the resources, per kind and then per name
+    - Resources that do not exist have a null primary key
+  returned: always
+  type: dict
+  sample:
+    certificates:
+      authentik Self-signed Certificate: <pk>
+    flows:
+      default-provider-authorization-explicit-consent: <pk>
+      default-provider-invalidation-flow: <pk>
+    groups: {}
+    scopes:
+      openid: <pk>
+      profile: <pk>
+    users: {}
+missing:
+  description:
+    - The names of the resources that do not exist, per kind
+    - Only kinds with missing resources are present
+  returned: always
+  type: dict
+  sample:
+    flows:
+      - default-provider-invalidation-flow
+"""
+
+
+from typing import NoReturn
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
+    Authentik,
+    get_base_arguments,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik_kinds import (
+    NAMED_KINDS,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    run_concurrently,
+)
+
+_KINDS = {
+    f"{kind}s": NAMED_KINDS[kind]
+    for kind in ["certificate", "flow", "group", "scope", "user"]
+}
+
+
+def main() -> NoReturn:  # type: ignore[misc]
+    argument_spec = get_base_arguments(
+        include_state=False, include_concurrency=True
+    )
+    for kind in _KINDS:
+        argument_spec[kind] = {
+            "type": "list",
+            "elements": "str",
+            "default": [],
+        }
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    clients = {
+        kind: Authentik(module, api_slug)
+        for kind, (api_slug, _) in _KINDS.items()
+    }
+    # dict.fromkeys removes duplicates while keeping the order
+    lookups = list(
+        dict.fromkeys(
+            (kind, name) for kind in _KINDS for name in module.params[kind]
+        )
+    )
+
+    def _resolve(lookup: tuple[str, str]) -> str | int | None:
+        kind, name = lookup
+        result = clients[kind].get_one({_KINDS[kind][1]: name})
+        return result["pk"] if result is not None else None
+
+    pks: dict[str, dict[str, str | int | None]] = {kind: {} for kind in _KINDS}
+    missing: dict[str, list[str]] = {}
+    for (kind, name), pk in zip(
+        lookups, run_concurrently(module, _resolve, lookups), strict=True
+    ):
+        pks[kind][name] = pk
+        if pk is None:
+            missing.setdefault(kind, []).append(name)
+
+    clients["flows"].exit_json(changed=False, pks=pks, missing=missing)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+DOCUMENTATION = """
+---
+module: authentik_resources
+
+short_description: Allows administration of multiple Authentik resources at once
+
+description:
+  - This module allows the administration of multiple Authentik resources, of
+    possibly different kinds, in a single invocation via the Authentik API.
+  - All the resources are reconciled in the same process and over the same
+    connection, which is much faster than looping over the single resource
+    modules.
+  - Resources are reconciled concurrently, so they need to be independent of
+    each other. For example, the same resource should not be listed twice.
+  - Each resource is reconciled the same way as with the dedicated module for
+    its kind, for example
+    M(benschubert.infrastructure.authentik_group) for C(group).
+  - The desired values are not validated by this module, and are sent as is to
+    the API. Please refer to the dedicated modules for the expected fields.
+
+options:
+  resources:
+    description:
+      - The list of resources to reconcile, in order
+    type: list
+    elements: dict
+    required: true
+    suboptions:
+      kind:
+        description:
+          - The kind of resource to reconcile
+        type: str
+        required: true
+        choices:
+          - application
+          - group
+          - outpost
+          - policy_binding
+          - propertymappings_scope
+          - provider_oauth2
+          - provider_proxy
+          - token
+          - user
+      desired:
+        description:
+          - The wanted value for the resource
+          - It needs to contain the fields used to identify the resource, as
+            for the dedicated module
+        type: dict
+        required: true
+      state:
+        description:
+          - Whether the resource should exist or not
+        type: str
+        default: present
+        choices:
+          - present
+          - absent
+
+extends_documentation_fragment:
+  - benschubert.infrastructure.authentik
+  - benschubert.infrastructure.authentik.concurrent
+  - benschubert.infrastructure.authentik.fingerprint
+
+author:
+  - Benjamin Schubert (@benjaminschubert)
+"""
+
+EXAMPLES = """
+- name: Ensure the groups exist and are allowed to access the application
+  benschubert.infrastructure.authentik_resources:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    resources:
+      - kind: group
+        desired:
+          name: Grafana Admins
+      - kind: group
+        desired:
+          name: Grafana Editors
+      - kind: policy_binding
+        desired:
+          group: <group-pk>
+          order: 0
+          target: <application-pk>
+"""
+
+RETURN = """
+results:
+  description:
+    - The result for each of the resources, in the same order as provided
+  returned: always
+  type: list
+  elements: dict
+  sample:
+    - kind: group
+      changed: true
+      msg: entry updated
+      data:
+        name: Grafana Admins
+        pk: <pk>
+      diff:
+        before: null
+        after:
+          name: Grafana Admins
+          pk: <pk>
+"""
+
+
+from typing import Any, NoReturn
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
+    Authentik,
+    get_base_arguments,
+    project_result,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik_kinds import (
+    RESOURCE_KINDS,
+    reconcile_kind,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    run_concurrently,
+)
+
+
+def main() -> NoReturn:  # type: ignore[misc]
+    argument_spec = get_base_arguments(
+        include_state=False,
+        include_concurrency=True,
+        include_fingerprint=True,
+    )
+    argument_spec["resources"] = {
+        "type": "list",
+        "elements": "dict",
+        "required": True,
+        "options": {
+            "kind": {
+                "type": "str",
+                "required": True,
+                "choices": sorted(RESOURCE_KINDS),
+            },
+            "desired": {"type": "dict", "required": True},
+            "state": {
+                "type": "str",
+                "choices": ["present", "absent"],
+                "default": "present",
+            },
+        },
+    }
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    # All clients share the same connections, so any can report on them
+    authentik = Authentik(module, "/api/v3/")
+    clients = {
+        resource["kind"]: Authentik(
+            module, RESOURCE_KINDS[resource["kind"]].api_slug
+        )
+        for resource in module.params["resources"]
+    }
+
+    def _reconcile(resource: dict[str, Any]) -> dict[str, Any]:
+        result = reconcile_kind(
+            module,
+            clients[resource["kind"]],
+            RESOURCE_KINDS[resource["kind"]],
+            resource["desired"],
+            resource["state"],
+        )
+        return {"kind": resource["kind"], **project_result(module, result)}
+
+    results = run_concurrently(module, _reconcile, module.params["resources"])
+
+    authentik.exit_json(
+        changed=any(result["changed"] for result in results),
+        diff=[result["diff"] for result in results if "diff" in result],
+        results=results,
+    )
+
+
+if __name__ == "__main__":
+    main()
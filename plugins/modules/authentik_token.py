@@ -43,10 +43,19 @@ options:
           - Whether the token expires or not
         type: bool
         default: true
+  reveal_key:
+    description:
+      - Whether to also return the key of the token, under RV(key)
+      - This avoids needing a separate
+        M(benschubert.infrastructure.authentik_token_value) task
+      - The task should then set C(no_log), to avoid showing the key in logs
+    type: bool
+    default: false
 
 extends_documentation_fragment:
   - benschubert.infrastructure.authentik
   - benschubert.infrastructure.authentik.stateful
+  - benschubert.infrastructure.authentik.fingerprint
 
 author:
   - Benjamin Schubert (@benjaminschubert)
@@ -63,6 +72,18 @@ EXAMPLES = """
       user: 2
       description: A token used during tests
       expiring: false
+
+- name: Create a token for user 2 and retrieve its key
+  benschubert.infrastructure.authentik_token:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    token:
+      identifier: my-test-token
+      intent: app_password
+      user: 2
+    reveal_key: true
+  register: _token
+  no_log: true
 """
 
 RETURN = """
@@ -76,6 +97,13 @@ data:
     identifier: my-test-token
     user: 6
     intent: app_password
+key:
+  description:
+    - The key of the token
+    - This is null in check mode, if the token does not exist yet
+  returned: when O(reveal_key) is true and O(state) is C(present)
+  type: str
+  sample: mytokenvalue
 """
 
 
@@ -83,13 +111,14 @@ from typing import NoReturn
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
-    execute,
+    Authentik,
     get_base_arguments,
+    reconcile,
 )
 
 
 def main() -> NoReturn:  # type: ignore[misc]
-    argument_spec = get_base_arguments()
+    argument_spec = get_base_arguments(include_fingerprint=True)
     argument_spec["token"] = {
         "type": "dict",
         "required": True,
@@ -105,6 +134,7 @@ def main() -> NoReturn:  # type: ignore[misc]
             "expiring": {"type": "bool", "default": True},
         },
     }
+    argument_spec["reveal_key"] = {"type": "bool", "default": False}
 
     module = AnsibleModule(
         argument_spec=argument_spec,
@@ -112,15 +142,17 @@ def main() -> NoReturn:  # type: ignore[misc]
     )
 
     token = module.params["token"]
+    state = module.params["state"]
 
-    execute(
-        module,
-        "/api/v3/core/tokens/",
-        "identifier",
-        None,
-        token,
-        state=module.params["state"],
-    )
+    authentik = Authentik(module, "/api/v3/core/tokens/")
+    result = reconcile(module, authentik, "identifier", None, token, state)
+
+    if module.params["reveal_key"] and state == "present":
+        # This reuses the connection opened to reconcile the token
+        value = authentik.request(f"{token['identifier']}/view_key/")
+        result["key"] = value["key"] if value is not None else None
+
+    authentik.exit_json(**result)
 
 
 if __name__ == "__main__":
@@ -61,7 +61,7 @@ def main() -> NoReturn:  # type: ignore[misc]
 
     authentik = Authentik(module, "/api/v3/core/tokens/")
     result = authentik.request(f"{module.params['token']}/view_key/")
-    module.exit_json(changed=False, key=result["key"])
+    authentik.exit_json(changed=False, key=result["key"])
 
 
 if __name__ == "__main__":
@@ -7,22 +7,34 @@ short_description: Allows adding or removing users to groups in Authentik
 description:
   - This module allows the administration of Authentik group membership via the
     Authentik API.
+  - Users are added or removed through the dedicated endpoints of the group.
+    Only the membership is changed, so concurrent changes to the group or to
+    the users are not overwritten.
+  - With O(users), the members of the group are fetched once, and the users
+    that need it are then added or removed concurrently.
   - See https://docs.goauthentik.io/docs/users-sources/user/
 
 options:
   group_pk:
     description:
-      - The pk for the group to add or remove the user from
+      - The pk for the group to add or remove the users from
     type: str
     required: true
   user_pk:
     description:
       - The pk of the user to add or remove to the group
-    type: str
-    required: true
+      - Mutually exclusive with O(users)
+    type: int
+  users:
+    description:
+      - The pks of the users to add or remove to the group
+      - Mutually exclusive with O(user_pk)
+    type: list
+    elements: int
 
 extends_documentation_fragment:
   - benschubert.infrastructure.authentik
+  - benschubert.infrastructure.authentik.concurrent
   - benschubert.infrastructure.authentik.stateful
 
 author:
@@ -31,16 +43,27 @@ author:
 
 EXAMPLES = """
 - name: Ensure the user with pk '123' is in the group '5'
-  benschubert.infrastructure.user_group:
+  benschubert.infrastructure.authentik_user_group:
     authentik_token: <my-secret-token>
     authentik_url: https://authentik.test/
     group_pk: 5
     user_pk: 123
+
+- name: Ensure the new employees are in the group '5'
+  benschubert.infrastructure.authentik_user_group:
+    authentik_token: <my-secret-token>
+    authentik_url: https://authentik.test/
+    group_pk: 5
+    users: "{{ new_employees | map(attribute='pk') }}"
 """
 
 RETURN = """
 data:
-  description: The information returned by the Authentik API for the user
+  description:
+    - The information returned by the Authentik API for the user, when
+      O(user_pk) is provided
+    - The information returned by the Authentik API for the group, when
+      O(users) is provided
   returned: always
   type: dict
   sample:
@@ -51,60 +74,180 @@ data:
     is_superuser: false
     pk: <user-pk>
     username: <user>
+changed_users:
+  description:
+    - The pks of the users that were added to or removed from the group
+  returned: always
+  type: list
+  elements: int
+  sample:
+    - <user2_pk>
 """
 
 
-import copy
-from typing import NoReturn
+from typing import Any, NoReturn
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
     Authentik,
     get_base_arguments,
 )
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    fail,
+    run_concurrently,
+)
 
 
-def main() -> NoReturn:  # type: ignore[misc]
-    argument_spec = get_base_arguments()
-    argument_spec["group_pk"] = {"type": "str", "required": True}
-    argument_spec["user_pk"] = {"type": "str", "required": True}
-
-    module = AnsibleModule(
-        argument_spec=argument_spec,
-        supports_check_mode=True,
+def _change_membership(
+    module: AnsibleModule,
+    groups: Authentik,
+    group_pk: str,
+    users: list[int],
+) -> None:
+    """
+    Add the users to the group, or remove them from it, concurrently.
+
+    :param module: The ansible module
+    :param groups: The client for groups
+    :param group_pk: The pk of the group
+    :param users: The pks of the users to add or remove
+    """
+    if module.check_mode:
+        return
+
+    action = (
+        "remove_user" if module.params["state"] == "absent" else "add_user"
     )
+    # A missing user or group is reported as a 404
+    run_concurrently(
+        module,
+        lambda user: groups.request(
+            f"{group_pk}/{action}/",
+            data={"pk": user},
+            method="POST",
+            allow_missing=False,
+        ),
+        users,
+    )
+
 
-    group_pk = module.params["group_pk"]
-    user_pk = module.params["user_pk"]
+def _sync_user(
+    module: AnsibleModule, groups: Authentik, group_pk: str, user_pk: int
+) -> dict[str, Any]:
+    """
+    Ensure the user is, or is not, in the group.
 
-    authentik = Authentik(module, "/api/v3/core/users/")
+    The user is read to know its groups, and is what is returned.
 
-    user = authentik.get(f"{user_pk}/")
-    final_state = copy.deepcopy(user)
+    :param module: The ansible module
+    :param groups: The client for groups
+    :param group_pk: The pk of the group
+    :param user_pk: The pk of the user
+    :return: The result, as expected by exit_json
+    """
+    user = Authentik(module, "/api/v3/core/users/").get(str(user_pk))
+    if user is None:
+        fail(module, f"The user {user_pk} does not exist")
 
     if module.params["state"] == "absent":
         if group_pk not in user["groups"]:
-            module.exit_json(changed=False, data=user)
-
-        final_state["groups"].pop(group_pk)
+            return {"changed": False, "data": user, "changed_users": []}
+        final_groups = [group for group in user["groups"] if group != group_pk]
         msg = "user removed from group"
     else:
         if group_pk in user["groups"]:
-            module.exit_json(changed=False, data=user)
-
-        final_state["groups"].append(group_pk)
+            return {"changed": False, "data": user, "changed_users": []}
+        final_groups = [*user["groups"], group_pk]
         msg = "user added to group"
 
-    if not module.check_mode:
-        final_state = authentik.update(user_pk, final_state)
+    _change_membership(module, groups, group_pk, [user_pk])
+
+    final_user = {**user, "groups": final_groups}
+    return {
+        "changed": True,
+        "diff": {"before": user, "after": final_user},
+        "msg": msg,
+        "data": final_user,
+        "changed_users": [user_pk],
+    }
+
+
+def _sync_users(
+    module: AnsibleModule, groups: Authentik, group_pk: str, users: list[int]
+) -> dict[str, Any]:
+    """
+    Ensure the users are, or are not, in the group.
+
+    The members of the group are read once, and the group is what is
+    returned.
+
+    :param module: The ansible module
+    :param groups: The client for groups
+    :param group_pk: The pk of the group
+    :param users: The pks of the users
+    :return: The result, as expected by exit_json
+    """
+    # Only the pks of the members are needed, not their whole objects
+    group = groups.request(
+        f"{group_pk}/", queryparams={"include_users": "false"}
+    )
+    if group is None:
+        fail(module, f"The group {group_pk} does not exist")
+
+    members = set(group["users"])
+    if module.params["state"] == "absent":
+        # dict.fromkeys removes duplicates while keeping the order
+        changed_users = [
+            user for user in dict.fromkeys(users) if user in members
+        ]
+        final_users = [user for user in group["users"] if user not in users]
+        msg = "users removed from group"
+    else:
+        changed_users = [
+            user for user in dict.fromkeys(users) if user not in members
+        ]
+        final_users = group["users"] + changed_users
+        msg = "users added to group"
+
+    if not changed_users:
+        return {"changed": False, "data": group, "changed_users": []}
+
+    _change_membership(module, groups, group_pk, changed_users)
+
+    final_group = {**group, "users": final_users}
+    return {
+        "changed": True,
+        "diff": {"before": group, "after": final_group},
+        "msg": msg,
+        "data": final_group,
+        "changed_users": changed_users,
+    }
 
-    module.exit_json(
-        changed=True,
-        diff={"before": user, "after": final_state},
-        msg=msg,
-        data=final_state,
+
+def main() -> NoReturn:  # type: ignore[misc]
+    argument_spec = get_base_arguments(include_concurrency=True)
+    argument_spec["group_pk"] = {"type": "str", "required": True}
+    argument_spec["user_pk"] = {"type": "int"}
+    argument_spec["users"] = {"type": "list", "elements": "int"}
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        mutually_exclusive=[("user_pk", "users")],
+        required_one_of=[("user_pk", "users")],
+        supports_check_mode=True,
     )
 
+    groups = Authentik(module, "/api/v3/core/groups/")
+    if module.params["users"] is None:
+        result = _sync_user(
+            module, groups, module.params["group_pk"], module.params["user_pk"]
+        )
+    else:
+        result = _sync_users(
+            module, groups, module.params["group_pk"], module.params["users"]
+        )
+    groups.exit_json(**result)
+
 
 if __name__ == "__main__":
     main()
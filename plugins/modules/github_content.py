@@ -8,6 +8,58 @@ description:
       Documentation on the API can be found at
       https://docs.github.com/en/rest/repos/contents
 options:
+    cache_dir:
+        description:
+            - A directory in which to cache the responses of the GitHub API
+            - When O(ref) is a commit id, which cannot change, a cached
+              response is reused without contacting GitHub
+            - Otherwise, the cached response is revalidated with its ETag,
+              which does not count against the GitHub rate limit when the
+              content did not change
+            - The directory is on the host running the module, delegate the
+              task to localhost to keep the cache on the controller
+        type: path
+    download:
+        description:
+            - Whether to also download the content of the files, concurrently
+            - The files are downloaded from their C(download_url), which does
+              not count against the GitHub rate limit, and are returned in
+              RV(files)
+            - With O(cache_dir), downloaded files are also cached by their git
+              hash, and thus never downloaded again
+        type: bool
+        default: false
+    exclude:
+        description:
+            - Glob patterns for the files not to download, relative to O(path)
+        type: list
+        elements: str
+        default: []
+    include:
+        description:
+            - Glob patterns for the files to download, relative to O(path)
+        type: list
+        elements: str
+        default:
+            - "*"
+    max_concurrency:
+        description:
+            - The maximum number of requests to send to GitHub at the same time
+        type: int
+        default: 4
+    mirror_dir:
+        description:
+            - A directory with local copies of repositories, read instead of
+              contacting GitHub, for example on hosts without access to it
+            - The copy of the repository at O(ref) is either the directory
+              C(<owner>/<repo>/<ref>) in it, or the tarball
+              C(<owner>/<repo>/<ref>.tar.gz), as downloaded from
+              C(https://api.github.com/repos/<owner>/<repo>/tarball/<ref>)
+            - Tarballs are read in a streaming fashion, and only the files
+              under O(path) are kept, nothing is extracted on disk
+            - The information returned in RV(content) only contains the
+              C(name), C(path), C(sha), C(size) and C(type) of the entries
+        type: path
     owner:
         description:
             - The owner of the repository
@@ -18,6 +70,12 @@ options:
             - The path inside the repository for the file or directory
         required: true
         type: str
+    recursive:
+        description:
+            - Whether to download the files of the subdirectories too, when
+              O(path) is a directory
+        type: bool
+        default: false
     ref:
         description:
             - The branch/tag/git id for which to get the path
@@ -41,6 +99,37 @@ EXAMPLES = """
     ref: devel
     repo: ansible
   register: _ansible_license
+
+- name: Get the dashboards of a given Mimir commit, at most once
+  github_content:
+    cache_dir: ~/.cache/github_content
+    owner: grafana
+    path: operations/mimir-mixin-compiled-baremetal/dashboards
+    ref: 4a4e1ec6d6d3b8f5bd8a3b21f4e3e2d0b8ca1d3f
+    repo: mimir
+  delegate_to: localhost
+
+- name: Download the dashboards, except the networking ones
+  github_content:
+    download: true
+    exclude:
+      - "*-networking.json"
+    include:
+      - "*.json"
+    owner: grafana
+    path: operations/mimir-mixin-compiled-baremetal/dashboards
+    ref: main
+    repo: mimir
+  register: _dashboards
+
+- name: Read the same dashboards from a local copy of the repository
+  github_content:
+    download: true
+    mirror_dir: /srv/mirrors/github.com
+    owner: grafana
+    path: operations/mimir-mixin-compiled-baremetal/dashboards
+    ref: main
+    repo: mimir
 """
 
 RETURN = """
@@ -49,49 +138,455 @@ msg:
   returned: always
   type: str
   sample: Retrieved file information
+cached:
+  description: Whether the content was served from O(cache_dir)
+  returned: always
+  type: bool
+  sample: true
 content:
     description: The information returned by the GitHub content API
     returned: always
     type: dict
     sample: See https://docs.github.com/en/rest/repos/contents
+files:
+  description:
+    - The downloaded files, sorted by path
+  returned: when O(download=true)
+  type: list
+  elements: dict
+  contains:
+    name:
+      description: The path of the file, relative to O(path)
+      type: str
+      sample: mimir-alertmanager.json
+    path:
+      description: The path of the file in the repository
+      type: str
+      sample: operations/mimir-mixin-compiled-baremetal/dashboards/mimir-alertmanager.json
+    sha:
+      description: The git hash of the file
+      type: str
+    content:
+      description:
+        - The content of the file, decoded as UTF-8
+        - Files that are not valid UTF-8, like images, are base64 encoded
+          instead, see RV(files[].encoding)
+      type: str
+    encoding:
+      description: How RV(files[].content) is encoded
+      type: str
+      choices:
+        - utf-8
+        - base64
+    cached:
+      description: Whether the file was served from O(cache_dir)
+      type: bool
 """
 
+import base64
+import contextlib
+import fnmatch
+import functools
+import hashlib
 import json
+import os
+import re
+import tarfile
+import tempfile
 from http import HTTPStatus
-from typing import NoReturn
+from pathlib import Path
+from typing import Any, NoReturn
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.urls import fetch_url
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.concurrency import (
+    DEFAULT_MAX_CONCURRENCY,
+    WorkerModule,
+    fail,
+    run_concurrently,
+)
+
+# Commit ids are immutable, unlike branches and tags
+_COMMIT_ID = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+
+
+def _load(path: Path) -> dict[str, Any] | None:
+    try:
+        entry: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        # The cache is only an optimization, fetch the content again
+        return None
+    return entry
+
+
+def _store(module: AnsibleModule, path: Path, data: bytes) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write atomically, another task could be reading it concurrently
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            Path(tmp_path).replace(path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+    except OSError as exc:
+        module.warn(f"Could not save the cache: {exc}")
+
+
+def _fetch(
+    module: AnsibleModule, url: str, headers: dict[str, str] | None = None
+) -> tuple[bytes | None, dict[str, Any]]:
+    # This runs in worker threads, where fetch_url can't exit the module
+    response, info = fetch_url(WorkerModule(module), url, headers=headers)
+    if info["status"] == HTTPStatus.NOT_MODIFIED:
+        return None, info
+    if info["status"] != HTTPStatus.OK:
+        fail(
+            module,
+            f"Error contacting github at {info['url']}."
+            f" Received a {info['status']}:\n{info.get('body', '')}",
+        )
+    return response.read(), info
+
+
+def _get_contents(module: AnsibleModule, path: str) -> tuple[Any, bool]:
+    """
+    Get the information on a path from the GitHub content API.
+
+    :param module: The ansible module
+    :param path: The path inside the repository
+    :return: The information returned by the API, and whether it was served
+             from the cache
+    """
+    p = module.params
+    url = f"https://api.github.com/repos/{p['owner']}/{p['repo']}/contents/{path}?ref={p['ref']}"
+
+    cache_path = None
+    entry = None
+    if p["cache_dir"] is not None:
+        cache_path = Path(
+            p["cache_dir"], f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+        )
+        entry = _load(cache_path)
+
+    if entry is not None and _COMMIT_ID.fullmatch(p["ref"]):
+        return entry["content"], True
+
+    headers = {}
+    if entry is not None and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    data, info = _fetch(module, url, headers)
+
+    if data is None:
+        if entry is None:
+            fail(module, f"Unexpected 304 from github at {info['url']}")
+        assert entry is not None
+        return entry["content"], True
+
+    content = json.loads(data)
+    if cache_path is not None:
+        _store(
+            module,
+            cache_path,
+            json.dumps(
+                {"etag": info.get("etag"), "content": content}
+            ).encode(),
+        )
+    return content, False
+
+
+def _list_files(module: AnsibleModule, contents: Any) -> list[dict[str, Any]]:
+    if isinstance(contents, dict):
+        return [contents] if contents["type"] == "file" else []
+
+    files = [entry for entry in contents if entry["type"] == "file"]
+    if module.params["recursive"]:
+        directories = [
+            entry["path"] for entry in contents if entry["type"] == "dir"
+        ]
+        for subcontents, _ in run_concurrently(
+            module, functools.partial(_get_contents, module), directories
+        ):
+            files.extend(_list_files(module, subcontents))
+    return files
+
+
+def _git_hash(data: bytes) -> str:
+    return hashlib.sha1(
+        b"blob %d\0%b" % (len(data), data), usedforsecurity=False
+    ).hexdigest()
+
+
+def _file_result(
+    name: str, path: str, data: bytes, *, sha: str, cached: bool
+) -> dict[str, Any]:
+    """
+    Get a file as returned in ``files``.
+
+    :param name: The path of the file, relative to the requested path
+    :param path: The path of the file in the repository
+    :param data: The content of the file
+    :param sha: The git hash of the file
+    :param cached: Whether the file was served from the cache
+    :return: The file, with its content decoded, or base64 encoded if it is
+             binary
+    """
+    try:
+        content, encoding = data.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        content, encoding = base64.b64encode(data).decode(), "base64"
+    return {
+        "name": name,
+        "path": path,
+        "sha": sha,
+        "content": content,
+        "encoding": encoding,
+        "cached": cached,
+    }
+
+
+def _download(module: AnsibleModule, file: dict[str, Any]) -> dict[str, Any]:
+    """
+    Download a file, using the cache.
+
+    :param module: The ansible module
+    :param file: The information on the file, from the GitHub content API
+    :return: The file, as returned in ``files``
+    """
+    # Files are cached by their hash, their content can thus never change
+    cache_path = None
+    data = None
+    if module.params["cache_dir"] is not None:
+        cache_path = Path(module.params["cache_dir"], "blobs", file["sha"])
+        with contextlib.suppress(FileNotFoundError):
+            data = cache_path.read_bytes()
+
+    cached = data is not None
+    if data is None:
+        data, _ = _fetch(module, file["download_url"])
+        assert data is not None
+        # Only cache what is known to be the right content
+        if cache_path is not None and _git_hash(data) == file["sha"]:
+            _store(module, cache_path, data)
+
+    return _file_result(
+        _relative_name(module.params["path"], file),
+        file["path"],
+        data,
+        sha=file["sha"],
+        cached=cached,
+    )
+
+
+def _relative_name(path: str, file: dict[str, Any]) -> str:
+    prefix = path.strip("/") + "/"
+    if prefix == "/":
+        return str(file["path"])
+    if file["path"].startswith(prefix):
+        return str(file["path"]).removeprefix(prefix)
+    # The path is the file itself
+    return str(file["name"])
+
+
+def _matches(name: str, include: list[str], exclude: list[str]) -> bool:
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in include) and (
+        not any(fnmatch.fnmatchcase(name, pattern) for pattern in exclude)
+    )
+
+
+def _read_tarball(
+    module: AnsibleModule, tarball: Path
+) -> dict[str, bytes | None]:
+    prefix = module.params["path"].strip("/")
+    entries: dict[str, bytes | None] = {}
+    found = False
+    with tarfile.open(tarball, "r|*") as archive:
+        for member in archive:
+            # The repository is in a single top-level directory
+            _, _, name = member.name.partition("/")
+            if prefix and name != prefix and not name.startswith(f"{prefix}/"):
+                continue
+            found = True
+            relative = name.removeprefix(prefix).lstrip("/")
+            if not relative and member.isdir():
+                continue
+            if not module.params["recursive"] and "/" in relative:
+                continue
+
+            if member.isdir():
+                entries[name] = None
+            elif member.isfile():
+                # In streaming mode, only the current member can be read
+                file = archive.extractfile(member)
+                assert file is not None
+                entries[name] = file.read()
+
+    if not found:
+        fail(module, f"{prefix} does not exist in {tarball}")
+    return entries
+
+
+def _read_directory(
+    module: AnsibleModule, directory: Path
+) -> dict[str, bytes | None]:
+    directory = directory.resolve()
+    base = (directory / module.params["path"].strip("/")).resolve()
+    if not base.is_relative_to(directory):
+        fail(module, f"{module.params['path']} is outside of {directory}")
+    if base.is_file():
+        return {base.relative_to(directory).as_posix(): base.read_bytes()}
+    if not base.is_dir():
+        fail(module, f"{base} does not exist")
+
+    children = (
+        base.rglob("*") if module.params["recursive"] else base.iterdir()
+    )
+    return {
+        child.relative_to(directory).as_posix(): (
+            child.read_bytes() if child.is_file() else None
+        )
+        for child in children
+        if child.is_file() or child.is_dir()
+    }
+
+
+def _read_mirror(  # type: ignore[return]  # noqa: RET503
+    module: AnsibleModule,
+) -> dict[str, bytes | None]:
+    """
+    Read the path from the local copy of the repository.
+
+    :param module: The ansible module
+    :return: The entries under the path, or the path itself if it is a file,
+             with the content of files and None for directories. Entries in
+             subdirectories are only included with ``recursive``.
+    """
+    p = module.params
+    mirror_dir = Path(p["mirror_dir"]).resolve()
+    root = mirror_dir / p["owner"] / p["repo"]
+    directory = (root / p["ref"]).resolve()
+    tarball = (root / f"{p['ref']}.tar.gz").resolve()
+    if not (
+        directory.is_relative_to(mirror_dir)
+        and tarball.is_relative_to(mirror_dir)
+    ):
+        fail(
+            module,
+            f"{p['owner']}/{p['repo']} at {p['ref']} is outside of"
+            f" {mirror_dir}",
+        )
+
+    if directory.is_dir():
+        return _read_directory(module, directory)
+    if tarball.is_file():
+        return _read_tarball(module, tarball)
+
+    fail(
+        module,
+        f"There is no copy of {p['owner']}/{p['repo']} at {p['ref']} in"
+        f" {p['mirror_dir']}",
+    )
+
+
+def _from_mirror(module: AnsibleModule) -> tuple[Any, list[dict[str, Any]]]:
+    """
+    Get the information on the path, and its files, from a local copy.
+
+    :param module: The ansible module
+    :return: The information on the path, as returned by the GitHub content
+             API, and the files, as returned in ``files``
+    """
+    p = module.params
+    entries = []
+    files = []
+    for path, data in sorted(_read_mirror(module).items()):
+        sha = None if data is None else _git_hash(data)
+        entry = {
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "sha": sha,
+            "size": 0 if data is None else len(data),
+            "type": "dir" if data is None else "file",
+        }
+        name = _relative_name(p["path"], entry)
+        # Entries of subdirectories are only read to be downloaded
+        if "/" not in name:
+            entries.append(entry)
+        if data is not None and _matches(name, p["include"], p["exclude"]):
+            assert sha is not None
+            files.append(_file_result(name, path, data, sha=sha, cached=False))
+
+    if len(entries) == 1 and entries[0]["path"] == p["path"].strip("/"):
+        # The path is the file itself
+        return entries[0], files
+    return entries, files
 
 
 def main() -> NoReturn:  # type: ignore[misc]
     module = AnsibleModule(
         argument_spec={
+            "cache_dir": {"type": "path"},
+            "download": {"type": "bool", "default": False},
+            "exclude": {"type": "list", "elements": "str", "default": []},
+            "include": {"type": "list", "elements": "str", "default": ["*"]},
+            "max_concurrency": {
+                "type": "int",
+                "default": DEFAULT_MAX_CONCURRENCY,
+            },
+            "mirror_dir": {"type": "path"},
             "owner": {"type": "str", "required": True},
             "repo": {"type": "str", "required": True},
             "path": {"type": "str", "required": True},
+            "recursive": {"type": "bool", "default": False},
             "ref": {"type": "str", "required": True},
         },
         supports_check_mode=True,
     )
 
     p = module.params
-    response, info = fetch_url(
-        module,
-        f"https://api.github.com/repos/{p['owner']}/{p['repo']}/contents/{p['path']}?ref={p['ref']}",
-    )
+    result: dict[str, Any] = {}
+    if p["mirror_dir"] is not None:
+        content, files = _from_mirror(module)
+        if p["download"]:
+            result["files"] = files
+        module.exit_json(
+            changed=False,
+            msg="Retrieved file information from the mirror",
+            cached=False,
+            content=content,
+            **result,
+        )
 
-    if info["status"] != HTTPStatus.OK:
-        module.fail_json(
-            msg=(
-                f"Error contacting github at {info['url']}."
-                f" Received a {info['status']}:\n{response.read()}"
+    content, cached = _get_contents(module, p["path"])
+    if p["download"]:
+        files = [
+            file
+            for file in _list_files(module, content)
+            if _matches(
+                _relative_name(p["path"], file), p["include"], p["exclude"]
             )
+        ]
+        result["files"] = sorted(
+            run_concurrently(
+                module, functools.partial(_download, module), files
+            ),
+            key=lambda file: file["path"],
         )
 
-    result = json.loads(response.read())
     module.exit_json(
-        changed=False, msg="Retrieved file information", content=result
+        changed=False,
+        msg=(
+            "Retrieved file information from the cache"
+            if cached
+            else "Retrieved file information"
+        ),
+        cached=cached,
+        content=content,
+        **result,
     )
 
 
@@ -0,0 +1,148 @@
+import json
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.testing import patch_module_args
+from ansible_collections.benschubert.infrastructure.plugins.module_utils import (
+    authentik,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.authentik import (
+    Authentik,
+    get_base_arguments,
+    get_retry_delay,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.connection_pool import (
+    get_connection_pool,
+)
+from conftest import Server
+
+GROUPS = [{"pk": str(pk), "name": f"group-{pk}"} for pk in range(25)]
+
+
+@pytest.mark.parametrize(
+    ("retry_after", "expected"),
+    [("3", 3), ("0.5", 0.5), ("-5", 0), ("120", 30)],
+)
+def test_retry_delay_follows_retry_after_seconds(
+    retry_after: str, expected: float
+) -> None:
+    assert get_retry_delay(0, 1, retry_after) == expected
+
+
+def test_retry_delay_follows_retry_after_date() -> None:
+    retry_after = format_datetime(
+        datetime.now(UTC) + timedelta(seconds=10), usegmt=True
+    )
+
+    # The date only has a precision of a second
+    assert 8 < get_retry_delay(0, 1, retry_after) <= 10
+
+
+@pytest.mark.parametrize(
+    ("offset", "expected"),
+    [(timedelta(hours=-1), 0), (timedelta(hours=1), 30)],
+    ids=["past", "future"],
+)
+def test_retry_delay_bounds_retry_after_date(
+    offset: timedelta, expected: float
+) -> None:
+    retry_after = format_datetime(datetime.now(UTC) + offset, usegmt=True)
+
+    assert get_retry_delay(0, 1, retry_after) == expected
+
+
+@pytest.mark.parametrize(
+    ("attempt", "backoff", "bound"),
+    [(0, 1, 1), (1, 1, 2), (3, 0.5, 4), (10, 1, 30)],
+)
+@pytest.mark.parametrize("retry_after", [None, "", "soon"])
+def test_retry_delay_uses_full_jitter(
+    monkeypatch: pytest.MonkeyPatch,
+    attempt: int,
+    backoff: float,
+    bound: float,
+    retry_after: str | None,
+) -> None:
+    bounds = []
+
+    def _uniform(low: float, high: float) -> float:
+        bounds.append((low, high))
+        return high
+
+    monkeypatch.setattr(authentik.random, "uniform", _uniform)
+
+    assert get_retry_delay(attempt, backoff, retry_after) == bound
+    assert bounds == [(0, bound)]
+
+
+def test_retry_delay_is_random_within_bounds() -> None:
+    delays = {get_retry_delay(2, 1) for _ in range(100)}
+
+    assert all(0 <= delay <= 4 for delay in delays)
+    # Retries of concurrent requests must not all happen at the same time
+    assert len(delays) > 1
+
+
+def _groups_page(
+    handler: BaseHTTPRequestHandler,
+) -> tuple[int, dict[str, str], bytes]:
+    query = parse_qs(urlsplit(handler.path).query)
+    page, size = int(query["page"][0]), int(query["page_size"][0])
+    start = (page - 1) * size
+    body = {
+        "pagination": {
+            "next": page + 1 if start + size < len(GROUPS) else 0,
+            "count": len(GROUPS),
+            "current": page,
+        },
+        "results": GROUPS[start : start + size],
+    }
+    return 200, {"Content-Type": "application/json"}, json.dumps(body).encode()
+
+
+@pytest.fixture
+def groups(server: Server) -> Iterator[Authentik]:
+    server.routes["/api/v3/core/groups/"] = _groups_page
+    args = {"authentik_url": server.url, "authentik_token": "token"}
+    with patch_module_args(args):
+        module = AnsibleModule(argument_spec=get_base_arguments())
+    yield Authentik(module, "/api/v3/core/groups/")
+    get_connection_pool(
+        server.url, None, validate_certs=True, timeout=10
+    ).close()
+
+
+def _pages(server: Server) -> list[str]:
+    return [
+        parse_qs(urlsplit(path).query)["page"][0] for path in server.requests
+    ]
+
+
+def test_iterate_follows_pagination(server: Server, groups: Authentik) -> None:
+    assert list(groups.iterate(page_size=10)) == GROUPS
+    assert _pages(server) == ["1", "2", "3"]
+    # The same connection is used for all the pages
+    assert server.connections == 1
+
+
+def test_iterate_fetches_pages_lazily(
+    server: Server, groups: Authentik
+) -> None:
+    resources = groups.iterate({"name__icontains": "group"}, page_size=10)
+
+    assert [next(resources) for _ in range(10)] == GROUPS[:10]
+    assert _pages(server) == ["1"]
+
+    assert next(resources) == GROUPS[10]
+    assert _pages(server) == ["1", "2"]
+    assert "name__icontains=group" in server.requests[-1]
+
+    # Stopping early reads the rest of the page, to reuse the connection
+    resources.close()
+    assert list(groups.iterate(page_size=10)) == GROUPS
+    assert server.connections == 1
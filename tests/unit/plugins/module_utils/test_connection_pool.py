@@ -0,0 +1,233 @@
+import gzip
+import http.client
+import zlib
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.connection_pool import (
+    ConnectionPool,
+    get_connection_pool,
+)
+from conftest import Route, Server
+
+BODY = b'{"results": []}' * 100
+
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {
+    "gzip": gzip.compress,
+    "x-gzip": gzip.compress,
+    "deflate": zlib.compress,
+}
+
+
+def _respond(body: bytes, headers: dict[str, str] | None = None) -> Route:
+    return lambda _: (200, headers or {}, body)
+
+
+@pytest.fixture
+def pools() -> Iterator[list[ConnectionPool]]:
+    pools: list[ConnectionPool] = []
+    yield pools
+    for pool in pools:
+        pool.close()
+
+
+@pytest.fixture
+def new_pool(
+    server: Server, pools: list[ConnectionPool]
+) -> Callable[..., ConnectionPool]:
+    def _new_pool(url: str = server.url, max_size: int = 1) -> ConnectionPool:
+        pool = ConnectionPool(
+            url, None, validate_certs=True, timeout=5, max_size=max_size
+        )
+        pools.append(pool)
+        return pool
+
+    return _new_pool
+
+
+def test_reuses_connections(
+    server: Server, new_pool: Callable[..., ConnectionPool]
+) -> None:
+    server.routes["/"] = _respond(BODY)
+    pool = new_pool()
+
+    for _ in range(3):
+        status, _, body = pool.request("GET", f"{server.url}?page=1")
+        assert (status, body) == (200, BODY)
+
+    assert server.connections == 1
+    assert pool.stats() == {
+        "requests": 3,
+        "handshakes": 1,
+        "handshakes_avoided": 2,
+        "tls_sessions_resumed": 0,
+    }
+    assert server.requests == ["/?page=1"] * 3
+
+
+def test_opens_new_connection_when_server_closes(
+    server: Server, new_pool: Callable[..., ConnectionPool]
+) -> None:
+    server.routes["/"] = _respond(BODY, {"Connection": "close"})
+    pool = new_pool()
+
+    pool.request("GET", server.url)
+    pool.request("GET", server.url)
+
+    assert server.connections == 2
+    assert pool.stats()["handshakes"] == 2
+
+
+def test_requests_compressed_responses(
+    server: Server, new_pool: Callable[..., ConnectionPool]
+) -> None:
+    headers: dict[str, str] = {}
+
+    def _record(
+        handler: BaseHTTPRequestHandler,
+    ) -> tuple[int, dict[str, str], bytes]:
+        headers.update(handler.headers)
+        return 200, {}, b""
+
+    server.routes["/"] = _record
+    new_pool().request("GET", server.url)
+
+    assert headers["Accept-Encoding"] == "gzip, deflate"
+
+
+@pytest.mark.parametrize("encoding", sorted(ENCODERS))
+def test_decodes_compressed_responses(
+    server: Server, new_pool: Callable[..., ConnectionPool], encoding: str
+) -> None:
+    compressed = ENCODERS[encoding](BODY)
+    server.routes["/"] = _respond(compressed, {"Content-Encoding": encoding})
+    pool = new_pool()
+
+    _, _, response = pool.open("GET", server.url)
+    with response:
+        # Read in small chunks, to go through partial decompression
+        chunks = iter(lambda: response.read(16), b"")
+        assert b"".join(chunks) == BODY
+    assert response.bytes_received == len(compressed)
+
+    # The connection was given back once the body was read
+    pool.request("GET", server.url)
+    assert server.connections == 1
+
+
+def test_fails_on_invalid_compressed_responses(
+    server: Server, new_pool: Callable[..., ConnectionPool]
+) -> None:
+    server.routes["/"] = _respond(b"not gzip", {"Content-Encoding": "gzip"})
+    pool = new_pool()
+
+    with pytest.raises(http.client.HTTPException, match="Invalid gzip"):
+        pool.request("GET", server.url)
+
+    # The connection is in an unknown state and must not be reused
+    server.routes["/"] = _respond(BODY)
+    pool.request("GET", server.url)
+    assert server.connections == 2
+
+
+def test_reuses_connection_of_responses_closed_early(
+    server: Server, new_pool: Callable[..., ConnectionPool]
+) -> None:
+    server.routes["/"] = _respond(BODY)
+    pool = new_pool()
+
+    _, _, response = pool.open("GET", server.url)
+    with response:
+        response.read(10)
+    assert response.bytes_received == len(BODY)
+
+    _, _, body = pool.request("GET", server.url)
+    assert body == BODY
+    assert server.connections == 1
+
+
+def test_closes_connection_of_large_responses_closed_early(
+    server: Server, new_pool: Callable[..., ConnectionPool]
+) -> None:
+    server.routes["/"] = _respond(b"x" * 1_000_000)
+    pool = new_pool()
+
+    _, _, response = pool.open("GET", server.url)
+    with response:
+        response.read(10)
+    assert response.bytes_received < 1_000_000
+
+    pool.request("GET", server.url)
+    assert server.connections == 2
+
+
+def test_keeps_at_most_max_size_idle_connections(
+    server: Server, new_pool: Callable[..., ConnectionPool]
+) -> None:
+    server.routes["/"] = _respond(BODY)
+    pool = new_pool(max_size=2)
+
+    for _ in range(2):
+        responses = [pool.open("GET", server.url)[2] for _ in range(3)]
+        for response in responses:
+            response.read()
+
+    # Only two connections were kept, the third one is opened again
+    assert server.connections == 4
+
+
+def test_shares_pools_per_server(server: Server) -> None:
+    def _get(
+        url: str, timeout: float = 5, max_size: int = 1
+    ) -> ConnectionPool:
+        return get_connection_pool(
+            url, None, validate_certs=True, timeout=timeout, max_size=max_size
+        )
+
+    pool = _get(server.url)
+
+    assert _get(f"{server.url}api/") is pool
+    assert _get(server.url, timeout=10) is not pool
+
+    _get(server.url, max_size=4)
+    _get(server.url, max_size=2)
+    assert pool.max_size == 4
+
+
+def test_sends_plain_http_through_the_proxy(
+    server: Server,
+    new_pool: Callable[..., ConnectionPool],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    headers: dict[str, str] = {}
+
+    def _record(
+        handler: BaseHTTPRequestHandler,
+    ) -> tuple[int, dict[str, str], bytes]:
+        headers.update(handler.headers)
+        return 200, {}, b""
+
+    server.routes["http://authentik.test/api/"] = _record
+    monkeypatch.setenv("http_proxy", server.url.replace("//", "//u:p@"))
+    monkeypatch.delenv("no_proxy", raising=False)
+    pool = new_pool("http://authentik.test/")
+
+    pool.request("GET", "http://authentik.test/api/?page=1")
+
+    assert server.requests == ["http://authentik.test/api/?page=1"]
+    assert headers["Proxy-Authorization"] == "Basic dTpw"
+
+
+def test_bypasses_the_proxy_for_no_proxy(
+    server: Server,
+    new_pool: Callable[..., ConnectionPool],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    server.routes["/"] = _respond(BODY)
+    monkeypatch.setenv("http_proxy", "http://proxy.invalid:3128")
+    monkeypatch.setenv("no_proxy", "127.0.0.1")
+
+    _, _, body = new_pool().request("GET", server.url)
+
+    assert body == BODY
@@ -0,0 +1,155 @@
+import json
+import stat
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from ansible_collections.benschubert.infrastructure.plugins.module_utils import (
+    fingerprint_cache,
+)
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.fingerprint_cache import (
+    FingerprintCache,
+    fingerprint,
+    get_fingerprint_cache,
+    save_fingerprint_caches,
+)
+
+DESIRED = {"name": "Admins", "attributes": {"a": 1, "b": 2}}
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    return tmp_path / "cache" / "fingerprints.json"
+
+
+@pytest.fixture
+def now(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(
+        fingerprint_cache, "time", SimpleNamespace(time=lambda: now[0])
+    )
+    return now
+
+
+def test_fingerprint_does_not_depend_on_key_order() -> None:
+    assert fingerprint(DESIRED) == fingerprint(
+        {"attributes": {"b": 2, "a": 1}, "name": "Admins"}
+    )
+    assert fingerprint(DESIRED) != fingerprint({**DESIRED, "name": "Users"})
+
+
+def test_lookup_returns_recorded_entries(path: Path, now: list[float]) -> None:
+    cache = FingerprintCache(str(path), ttl=60)
+    assert cache.lookup("group/Admins", DESIRED) is None
+
+    cache.record("group/Admins", DESIRED, {"pk": "1"})
+
+    entry = cache.lookup("group/Admins", DESIRED)
+    assert entry is not None
+    assert entry["data"] == {"pk": "1"}
+    assert entry["verified"] == now[0]
+
+
+def test_lookup_ignores_entries_for_other_desired_values(path: Path) -> None:
+    cache = FingerprintCache(str(path), ttl=60)
+    cache.record("group/Admins", DESIRED, {"pk": "1"})
+
+    assert cache.lookup("group/Admins", {**DESIRED, "name": "Users"}) is None
+    assert cache.lookup("group/Users", DESIRED) is None
+
+
+def test_lookup_ignores_expired_entries(path: Path, now: list[float]) -> None:
+    cache = FingerprintCache(str(path), ttl=60)
+    cache.record("group/Admins", DESIRED, {"pk": "1"})
+
+    now[0] += 60
+    assert cache.lookup("group/Admins", DESIRED) is not None
+    now[0] += 1
+    assert cache.lookup("group/Admins", DESIRED) is None
+
+
+def test_save_persists_entries(path: Path) -> None:
+    cache = FingerprintCache(str(path), ttl=60)
+    cache.record("group/Admins", DESIRED, {"pk": "1"})
+    cache.save()
+
+    entry = FingerprintCache(str(path), ttl=60).lookup("group/Admins", DESIRED)
+    assert entry is not None
+    assert entry["data"] == {"pk": "1"}
+    # Resources can hold secrets
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+def test_save_without_entries_does_nothing(path: Path) -> None:
+    FingerprintCache(str(path), ttl=60).save()
+
+    assert not path.exists()
+
+
+def test_save_merges_entries_of_other_runs(path: Path) -> None:
+    first = FingerprintCache(str(path), ttl=60)
+    second = FingerprintCache(str(path), ttl=60)
+    first.record("group/Admins", DESIRED, {"pk": "1"})
+    second.record("group/Users", DESIRED, {"pk": "2"})
+    first.record("group/Shared", DESIRED, {"pk": "old"})
+    second.record("group/Shared", DESIRED, {"pk": "new"})
+
+    first.save()
+    second.save()
+
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    assert sorted(entries) == ["group/Admins", "group/Shared", "group/Users"]
+    # The last run to save wins for the entries both recorded
+    assert entries["group/Shared"]["data"] == {"pk": "new"}
+
+
+@pytest.mark.parametrize("content", ["", "{not json", "[1, 2"])
+def test_starts_again_from_invalid_files(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True)
+    path.write_text(content, encoding="utf-8")
+
+    cache = FingerprintCache(str(path), ttl=60)
+    assert cache.lookup("group/Admins", DESIRED) is None
+
+    cache.record("group/Admins", DESIRED, {"pk": "1"})
+    cache.save()
+    assert list(json.loads(path.read_text(encoding="utf-8"))) == [
+        "group/Admins"
+    ]
+
+
+def test_caches_are_shared_across_threads(
+    path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(fingerprint_cache, "_CACHES", {})
+    load = FingerprintCache._load  # noqa: SLF001  # pylint: disable=protected-access
+
+    # Make loading the file slow, for the threads to all request it at once
+    def _slow_load(self: FingerprintCache) -> Any:
+        time.sleep(0.05)
+        return load(self)
+
+    monkeypatch.setattr(FingerprintCache, "_load", _slow_load)
+    barrier = threading.Barrier(8)
+    caches = []
+
+    def _record(index: int) -> None:
+        barrier.wait()
+        cache = get_fingerprint_cache(str(path), 60)
+        cache.record(f"group/{index}", DESIRED, {"pk": str(index)})
+        caches.append(cache)
+
+    threads = [
+        threading.Thread(target=_record, args=(index,)) for index in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    save_fingerprint_caches()
+
+    assert len({id(cache) for cache in caches}) == 1
+    assert len(json.loads(path.read_text(encoding="utf-8"))) == 8
@@ -0,0 +1,101 @@
+import io
+import json
+from typing import Any
+
+import pytest
+from ansible_collections.benschubert.infrastructure.plugins.module_utils.json_stream import (
+    JSONListStream,
+)
+
+RESULTS = [
+    {"pk": 1, "name": "Admins", "attributes": {"notes": "été ✓"}},
+    {"pk": 12345, "name": "Users", "ratio": 1.5e3, "parent": None},
+    [],
+    "plain",
+    True,
+]
+PAGINATION = {"next": 2, "count": 250, "current": 1}
+
+
+def _stream(
+    document: str, chunk_size: int = 65536
+) -> tuple[JSONListStream, io.BytesIO]:
+    body = io.BytesIO(document.encode())
+    return JSONListStream(body.read, "results", chunk_size), body
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 65536])
+@pytest.mark.parametrize(
+    "document",
+    [
+        {"pagination": PAGINATION, "results": RESULTS},
+        {"results": RESULTS, "pagination": PAGINATION},
+    ],
+    ids=["pagination-first", "pagination-last"],
+)
+def test_decodes_entries_and_fields(
+    document: dict[str, Any], chunk_size: int
+) -> None:
+    stream, _ = _stream(json.dumps(document, indent=2), chunk_size)
+
+    # Multi-byte characters and numbers can be split across chunks
+    assert list(stream) == RESULTS
+    assert stream.fields == {"pagination": PAGINATION}
+
+
+def test_decodes_compact_documents() -> None:
+    document = json.dumps(
+        {"pagination": PAGINATION, "results": RESULTS},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    stream, _ = _stream(document, chunk_size=2)
+
+    assert list(stream) == RESULTS
+    assert stream.fields == {"pagination": PAGINATION}
+
+
+@pytest.mark.parametrize(
+    ("document", "fields"),
+    [
+        ('{"results": []}', {}),
+        ('{ "pagination" : {}, "results" : [ ] }', {"pagination": {}}),
+        ("{}", {}),
+    ],
+)
+def test_decodes_empty_lists(document: str, fields: dict[str, Any]) -> None:
+    stream, _ = _stream(document, chunk_size=1)
+
+    assert not list(stream)
+    assert stream.fields == fields
+
+
+def test_reads_lazily() -> None:
+    document = json.dumps({"results": [{"pk": pk} for pk in range(1000)]})
+    stream, body = _stream(document, chunk_size=64)
+
+    entries = iter(stream)
+    assert next(entries) == {"pk": 0}
+
+    assert stream.bytes_read == body.tell() < len(document) / 10
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        "",
+        "[]",
+        '"results"',
+        '{"results" [1]}',
+        '{"results": [1 2]}',
+        '{"results": [1,',
+        '{"results": [1]',
+        '{"results": [1], "pagination": {"next": tru}}',
+        '{"results": [{"pk": 1]}',
+    ],
+)
+def test_fails_on_malformed_documents(document: str) -> None:
+    stream, _ = _stream(document, chunk_size=4)
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        list(stream)
@@ -0,0 +1,183 @@
+import base64
+import io
+import json
+import shutil
+import tarfile
+from pathlib import Path
+from typing import Any
+
+import pytest
+from ansible.module_utils.testing import patch_module_args
+from ansible_collections.benschubert.infrastructure.plugins.modules import (
+    github_content,
+)
+
+FILES = {
+    "README.md": b"readme",
+    "ops/dash/a.json": b'{"a": 1}',
+    "ops/dash/b-networking.json": b"{}",
+    "ops/dash/logo.png": b"\x89PNG\xff",
+    "ops/dash/sub/c.json": b"{}",
+    "ops/other.txt": b"other",
+}
+
+
+@pytest.fixture(params=["directory", "tarball"])
+def mirror(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    root = tmp_path / "mirror"
+    repository = root / "grafana/mimir"
+    repository.mkdir(parents=True)
+    # Files next to the mirror, which must never be readable
+    (tmp_path / "secret.txt").write_bytes(b"secret")
+
+    tree = tmp_path / "src/grafana-mimir-abc123"
+    for name, content in FILES.items():
+        (tree / name).parent.mkdir(parents=True, exist_ok=True)
+        (tree / name).write_bytes(content)
+
+    if request.param == "directory":
+        shutil.copytree(tree, repository / "v1")
+    else:
+        with tarfile.open(repository / "v1.tar.gz", "w:gz") as archive:
+            archive.add(tree, arcname=tree.name)
+    return root
+
+
+def _run(
+    capsys: pytest.CaptureFixture[str], mirror: Path, **kwargs: Any
+) -> dict[str, Any]:
+    args = {
+        "owner": "grafana",
+        "repo": "mimir",
+        "ref": "v1",
+        "path": "ops/dash",
+        "mirror_dir": str(mirror),
+        "download": True,
+        **kwargs,
+    }
+    with patch_module_args(args), pytest.raises(SystemExit):
+        github_content.main()
+    result: dict[str, Any] = json.load(io.StringIO(capsys.readouterr().out))
+    return result
+
+
+def _files(result: dict[str, Any]) -> dict[str, bytes]:
+    return {
+        file["name"]: (
+            base64.b64decode(file["content"])
+            if file["encoding"] == "base64"
+            else file["content"].encode()
+        )
+        for file in result["files"]
+    }
+
+
+def test_reads_directory(
+    capsys: pytest.CaptureFixture[str], mirror: Path
+) -> None:
+    result = _run(capsys, mirror)
+
+    assert not result.get("failed")
+    assert [(entry["name"], entry["type"]) for entry in result["content"]] == [
+        ("a.json", "file"),
+        ("b-networking.json", "file"),
+        ("logo.png", "file"),
+        ("sub", "dir"),
+    ]
+    assert _files(result) == {
+        name.removeprefix("ops/dash/"): content
+        for name, content in FILES.items()
+        if name.startswith("ops/dash/") and "/sub/" not in name
+    }
+
+
+def test_reads_recursively_with_filters(
+    capsys: pytest.CaptureFixture[str], mirror: Path
+) -> None:
+    result = _run(
+        capsys,
+        mirror,
+        recursive=True,
+        include=["*.json"],
+        exclude=["*-networking.json"],
+    )
+
+    assert sorted(_files(result)) == ["a.json", "sub/c.json"]
+
+
+def test_reads_file(capsys: pytest.CaptureFixture[str], mirror: Path) -> None:
+    result = _run(capsys, mirror, path="ops/dash/a.json")
+
+    assert result["content"]["path"] == "ops/dash/a.json"
+    assert _files(result) == {"a.json": FILES["ops/dash/a.json"]}
+
+
+def test_returns_git_hashes(
+    capsys: pytest.CaptureFixture[str], mirror: Path
+) -> None:
+    result = _run(capsys, mirror, path="ops/dash/a.json")
+
+    # As returned by `git hash-object`
+    assert (
+        result["content"]["sha"] == "4a036f56bb619924ec4189bd84ed716c766971ae"
+    )
+
+
+def test_encodes_binary_files(
+    capsys: pytest.CaptureFixture[str], mirror: Path
+) -> None:
+    result = _run(capsys, mirror, path="ops/dash/logo.png")
+
+    [file] = result["files"]
+    assert file["encoding"] == "base64"
+    assert base64.b64decode(file["content"]) == FILES["ops/dash/logo.png"]
+
+
+def test_fails_on_missing_path(
+    capsys: pytest.CaptureFixture[str], mirror: Path
+) -> None:
+    result = _run(capsys, mirror, path="ops/missing")
+
+    assert result["failed"]
+    assert "does not exist" in result["msg"]
+
+
+def test_fails_on_missing_ref(
+    capsys: pytest.CaptureFixture[str], mirror: Path
+) -> None:
+    result = _run(capsys, mirror, ref="v2")
+
+    assert result["failed"]
+    assert result["msg"].startswith("There is no copy of grafana/mimir at v2")
+
+
+@pytest.mark.parametrize(
+    "path", ["..", "../../../secret.txt", "ops/../../../../secret.txt"]
+)
+def test_does_not_read_outside_of_the_ref(
+    capsys: pytest.CaptureFixture[str], mirror: Path, path: str
+) -> None:
+    result = _run(capsys, mirror, path=path)
+
+    assert result["failed"]
+    assert "secret" not in json.dumps(result.get("files", []))
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        {"ref": "../../..", "path": "secret.txt"},
+        {"ref": "../../../secret.txt", "path": ""},
+        {"owner": "..", "repo": "..", "ref": "..", "path": "secret.txt"},
+        {"ref": "/", "path": "etc/hostname"},
+    ],
+    ids=["ref", "ref-file", "owner-repo", "absolute"],
+)
+def test_does_not_read_outside_of_the_mirror(
+    capsys: pytest.CaptureFixture[str], mirror: Path, args: dict[str, str]
+) -> None:
+    result = _run(capsys, mirror, **args)
+
+    assert result["failed"]
+    assert "is outside of" in result["msg"]
+    assert "files" not in result